@@ -0,0 +1,218 @@
+"""
+Benchmarks for the text processing in sg3_core.
+
+    python bench_sg3.py [--scales 10000 100000 1000000] [--output bench_results.json]
+                        [--compare baseline.json]
+
+A synthetic corpus is generated for each scale (number of words), with a
+vocabulary whose word frequencies follow a Zipf distribution, some hyphenated
+words, some capitalized words and some words split over a line with "-\\n".
+The same --seed always gives the same corpus.
+
+Each function is timed (best of --repeat runs) and run once more under
+tracemalloc for its peak memory. Results are written as JSON so a run can be
+saved as a baseline and compared with --compare after a change.
+"""
+import sys
+import os
+import io
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+import sg3_core
+
+DEFAULT_SCALES = [10000, 100000, 1000000]
+
+def make_vocabulary(rng, size, hyphen_rate):
+    """ Returns size distinct lowercase words, some of them hyphenated """
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = []
+    seen = set()
+    while len(words) < size:
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(2, 10)))
+        if rng.random() < hyphen_rate:
+            word += "-" + "".join(rng.choice(letters) for _ in range(rng.randint(2, 6)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+def make_corpus(word_count, vocab_size=20000, zipf=1.1, hyphen_rate=0.02, capital_rate=0.1,
+                break_rate=0.05, words_per_line=12, seed=0):
+    """
+    Returns the text of a synthetic corpus of word_count words.
+    zipf is the skew of the word frequencies (the word at rank r is picked with
+    weight 1 / r ** zipf), break_rate is the share of lines that end in a word
+    split with "-\\n".
+    """
+    rng = random.Random(seed)
+    vocab = make_vocabulary(rng, vocab_size, hyphen_rate)
+    weights = [1 / rank ** zipf for rank in range(1, vocab_size + 1)]
+    cum_weights = []
+    total = 0
+    for weight in weights:
+        total += weight
+        cum_weights.append(total)
+    picked = rng.choices(vocab, cum_weights=cum_weights, k=word_count)
+
+    lines = []
+    for start in range(0, word_count, words_per_line):
+        line = [word.capitalize() if rng.random() < capital_rate else word
+                for word in picked[start:start + words_per_line]]
+        last = line[-1]
+        if rng.random() < break_rate and len(last) >= 4 and "-" not in last:
+            # Split the last word over a line break with a hyphen
+            cut = len(last) // 2
+            line[-1] = last[:cut] + "-\n" + last[cut:]
+        lines.append(" ".join(line) + rng.choice([".", ",", "", ";"]))
+    return "\n".join(lines) + "\n"
+
+def split_corpus(text, parts):
+    """ Splits the corpus text into parts at line breaks (for multi-file benchmarks) """
+    lines = text.splitlines(keepends=True)
+    size = -(-len(lines) // parts)
+    return ["".join(lines[i:i + size]) for i in range(0, len(lines), size)]
+
+def measure(func, repeat):
+    """ Returns (best seconds, peak bytes) for func() """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def bench_scale(word_count, args, workdir):
+    text = make_corpus(word_count, args.vocab_size, args.zipf, seed=args.seed)
+    size = len(text.encode("utf-8"))
+    parts = split_corpus(text, args.files)
+    filenames = []
+    for i, part in enumerate(parts, start=1):
+        filename = os.path.join(workdir, f"bench_{word_count}_{i}.txt")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(part)
+        filenames.append(filename)
+
+    # Inputs the later stages need
+    wordlists = [sg3_core.extract_words(part) for part in parts]
+    indexes = [sg3_core.build_word_index(words) for words in wordlists]
+    concordance = sg3_core.build_concordance(filenames)
+    rng = random.Random(args.seed)
+    queries = [word.lower() for word in rng.sample(wordlists[0], min(args.queries, len(wordlists[0])))]
+    def quiet(func):
+        # Functions that print their tables are timed without the terminal output
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+        return run
+
+    def tokenize_files(engine):
+        # Streams every file through one tokenizer engine
+        def run():
+            for filename in filenames:
+                with open(filename, "rb") as f:
+                    for _ in engine.iter_chunks(f):
+                        pass
+        return run
+
+    cases = {
+        "extract_words": lambda: [sg3_core.extract_words(part) for part in parts],
+        "extract_word_positions": lambda: [sg3_core.extract_word_positions(part) for part in parts],
+        "tokenize_regex": tokenize_files(sg3_core.RegexTokenizer()),
+        "tokenize_fast": tokenize_files(sg3_core.FastTokenizer()),
+        "build_word_index": lambda: [sg3_core.build_word_index(words) for words in wordlists],
+        "count_word": lambda: [sg3_core.count_word(filenames, indexes, word) for word in queries],
+        "build_concordance": lambda: sg3_core.build_concordance(filenames),
+        "write_concordance": lambda: sg3_core.write_concordance(concordance, io.StringIO(), echo="none"),
+        "write_extra_lists": lambda: sg3_core.write_extra_lists(concordance, filenames, wordlists,
+                                                                 dest=io.StringIO(), echo="none"),
+        "print_summary_words": quiet(lambda: sg3_core.print_summary_words(queries, filenames, indexes)),
+    }
+    results = []
+    for name, func in cases.items():
+        if args.only and name not in args.only:
+            continue
+        seconds, peak = measure(func, args.repeat)
+        result = {
+            "function": name,
+            "words": word_count,
+            "bytes": size,
+            "files": len(filenames),
+            "seconds": round(seconds, 6),
+            "words_per_second": round(word_count / seconds) if seconds else None,
+            "mb_per_second": round(size / seconds / 1e6, 3) if seconds else None,
+            "peak_mb": round(peak / 1e6, 3),
+        }
+        if name in ("count_word", "print_summary_words"):
+            result["queries"] = len(queries)
+        results.append(result)
+        print(f"{name:>24} {word_count:>10} words {seconds:>10.4f}s "
+              f"{result['mb_per_second'] or 0:>9.2f} MB/s {result['peak_mb']:>9.2f} MB peak")
+    return results
+
+def compare(results, baseline_path):
+    """ Prints how each result's time and memory compare to a saved baseline """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["function"], r["words"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path} (time and peak memory, new / baseline):")
+    for result in results:
+        old = baseline.get((result["function"], result["words"]))
+        if old is None:
+            continue
+        time_ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        memory_ratio = result["peak_mb"] / old["peak_mb"] if old["peak_mb"] else float("nan")
+        print(f"{result['function']:>24} {result['words']:>10} words "
+              f"{time_ratio:>8.2f}x time {memory_ratio:>8.2f}x memory")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SG3 text processing functions")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="corpus sizes in words")
+    parser.add_argument("--vocab-size", type=int, default=20000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="skew of the word frequencies")
+    parser.add_argument("--files", type=int, default=4, help="files each corpus is split into")
+    parser.add_argument("--queries", type=int, default=200, help="words searched by count_word")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per function (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", help="only run these functions")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tokenizer", choices=list(sg3_core.TOKENIZERS), default=sg3_core.TOKENIZER.name,
+                        help="engine used by the other functions")
+    args = parser.parse_args(argv)
+    sg3_core.set_tokenizer(args.tokenizer)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for word_count in args.scales:
+            results += bench_scale(word_count, args, workdir)
+
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {"vocab_size": args.vocab_size, "zipf": args.zipf, "files": args.files,
+                     "queries": args.queries, "repeat": args.repeat, "seed": args.seed,
+                     "tokenizer": args.tokenizer},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Randomized check that the tokenizer engines in sg3_core split text into the
+same words, on the same lines, as the original SG3 regular expressions.
+
+    python check_sg3.py [--cases 20000] [--seed 0]
+
+Random text is made mostly of the characters that matter to the tokenizers:
+letters, hyphens, spaces, newlines, CRLF and lone CR, punctuation and non-ASCII
+letters. Each case is checked with extract_words, extract_word_positions and
+the streaming reader (with small chunk sizes, so words and hyphenated line
+breaks run over chunk ends), for every engine.
+Prints the first few mismatches and exits with status 1 if there are any.
+"""
+import re
+import io
+import sys
+import random
+import argparse
+import sg3_core
+
+PIECES = ["a", "b", "Z", "word", "Hy", "-", "-", "--", "-\n", "--\n", " ", " ", "\n", "\n\n",
+          "\r\n", "\r", ".", ",", "'", "é", "日本", "\t"]
+
+def reference_words(text):
+    """ The original extract_words """
+    text = re.sub(r"-\n", "", text)
+    return re.findall(r"[A-Za-z]+(?:-[A-Za-z]+)*", text)
+
+def reference_positions(text, first_line=1):
+    """ The original words, each with the line of the original text it starts on """
+    joined = []
+    starts = [] # Line of each character of the joined text
+    line = first_line
+    i = 0
+    while i < len(text):
+        if text.startswith("-\n", i):
+            line += 1
+            i += 2
+            continue
+        joined.append(text[i])
+        starts.append(line)
+        if text[i] == "\n":
+            line += 1
+        i += 1
+    words = []
+    lines = []
+    for match in re.finditer(r"[A-Za-z]+(?:-[A-Za-z]+)*", "".join(joined)):
+        words.append(match.group())
+        lines.append(starts[match.start()])
+    return words, lines
+
+def random_text(rng):
+    return "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+
+def check_case(text, rng):
+    """ Returns a list of (what, expected, got) for every engine that disagrees """
+    mismatches = []
+    expected_words = reference_words(text)
+    expected_positions = reference_positions(text)
+    # Text read from a file has its line endings turned into \n
+    read_text = text.replace("\r\n", "\n").replace("\r", "\n")
+    expected_read = reference_positions(read_text)
+    data = text.encode("utf-8")
+    for name in sg3_core.TOKENIZERS:
+        sg3_core.set_tokenizer(name)
+        got = sg3_core.extract_words(text)
+        if got != expected_words:
+            mismatches.append((f"{name} extract_words", expected_words, got))
+        got = sg3_core.extract_word_positions(text)
+        if got != expected_positions:
+            mismatches.append((f"{name} extract_word_positions", expected_positions, got))
+        chunk_size = rng.randint(1, 16)
+        words = []
+        lines = []
+        for words_array, lines_array in sg3_core.iter_word_chunks(io.BytesIO(data), chunk_size):
+            words += words_array
+            lines += lines_array
+        if (words, lines) != expected_read:
+            mismatches.append((f"{name} iter_word_chunks chunk_size={chunk_size}", expected_read, (words, lines)))
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks the tokenizer engines against the original regular expressions.")
+    parser.add_argument("--cases", type=int, default=20000, help="number of random texts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for _ in range(args.cases):
+        text = random_text(rng)
+        for what, expected, got in check_case(text, rng):
+            failures += 1
+            if failures <= 10:
+                print(f"{what}: {text!r}\n    expected {expected!r}\n    got      {got!r}")
+    sg3_core.set_tokenizer("fast")
+    print(f"{args.cases} cases, {failures} mismatches")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
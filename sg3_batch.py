@@ -0,0 +1,211 @@
+"""
+Runs SG3 without the GUI (and without importing Tk) for scripts, cron jobs and servers.
+
+    python sg3_batch.py manifest.json [more_manifests.json ...] [--quiet] [--no-cache]
+                        [--stats stats.json] [--tokenizer fast|regex] [--store corpus.db]
+
+A manifest is a JSON object. Paths in it are relative to the manifest's folder.
+    {
+        "files": ["a.txt", "books/", "more/*.txt"],  files, folders or glob patterns
+        "queries": ["whale", "sea-side"],            words (or patterns like "sea*", phrases like
+                                                     "white whale" or "whale ~5 sea") to search for
+        "concordance": true,                         write CONCORDANCE.TXT and ExtraLists.txt
+        "output_dir": "out",                         where the output files go (default ".")
+        "results": "results.json",                   machine readable results, in output_dir
+        "workers": 1                                 processes used for the concordance
+                                                     (null = every CPU)
+    }
+Only "files" is required. Each manifest gets its own output files, the same
+ones the GUI writes, plus the results file.
+
+With --store, the parsed files are kept in an SQLite database (see sg3_store)
+instead of in memory, and everything is worked out with queries on it. Files
+already in the database are only read again if they changed. "workers" is
+not used then.
+"""
+import sys
+import os
+import json
+import argparse
+from sg3_store import SqliteStore
+from sg3_core import (STATS, TOKENIZERS, TOKENIZER, set_tokenizer, Corpus, FileIngest, ParseCache,
+                      CACHE_DIR, expand_file_pattern, txt_filename, legal_word_error, legal_pattern_error, is_pattern, search_result_lines,
+                      is_positional_query, parse_positional_query, positional_query_error,
+                      positional_result_lines, print_summary_words, build_concordance,
+                      build_concordance_from_positions, write_concordance, write_extra_lists)
+
+RESULTS_NAME = "results.json"
+
+def load_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), list):
+        raise ValueError(f"{path}: a manifest must be a JSON object with a \"files\" list")
+    return manifest
+
+# Expands the manifest's files, folders and patterns (no duplicates, in order)
+def _manifest_filenames(manifest, base_dir):
+    filenames = []
+    failed = []
+    seen = set()
+    for pattern in manifest["files"]:
+        names = expand_file_pattern(os.path.normpath(os.path.join(base_dir, pattern)))
+        if not names:
+            failed.append((pattern, "No .TXT files match."))
+        for name in names:
+            if name in seen:
+                continue
+            seen.add(name)
+            if not txt_filename(name):
+                failed.append((name, "Filename must end in .TXT."))
+            elif not os.path.isfile(name):
+                failed.append((name, "File does not exist."))
+            else:
+                filenames.append(name)
+    return filenames, failed
+
+def run_manifest(manifest, base_dir=".", cache=None, quiet=False, store=None):
+    """
+    Opens the manifest's files, runs its searches and writes its output files.
+    The files are kept in an SqliteStore if store is given, otherwise in memory.
+    Returns the results (also written to the manifest's results file) as a dict.
+    """
+    echo = "summary" if quiet else "all"
+    output_dir = os.path.normpath(os.path.join(base_dir, manifest.get("output_dir", ".")))
+    os.makedirs(output_dir, exist_ok=True)
+
+    filenames, failed = _manifest_filenames(manifest, base_dir)
+    if store is not None:
+        corpus, store_failed = store.open_files(filenames)
+        failed += [(filename, str(error)) for filename, error in store_failed]
+    else:
+        corpus = Corpus(max_files=len(filenames))
+        ingest = FileIngest(filenames, corpus.vocab, cache)
+        ingest.run()
+        for filename, words, lines in ingest.results:
+            corpus.add(filename, words, lines)
+        failed += [(filename, str(error)) for filename, error in ingest.failed]
+
+    results = {
+        "files": [{"name": f.name, "total_words": f.total_words, "distinct_words": f.distinct_words}
+                  for f in corpus],
+        "corpus": {"total_words": corpus.stats.total_words,
+                   "distinct_words": corpus.stats.distinct_words,
+                   "top_words": [{"word": word, "count": count, "files": files}
+                                 for word, count, files in corpus.stats.top(10)]},
+        "failed": [{"name": name, "error": error} for name, error in failed],
+        "searches": [],
+        "invalid_queries": [],
+        "concordance": None,
+        "extra_lists": None,
+    }
+    if not quiet and len(corpus) > 0:
+        corpus.print_file_table()
+
+    # Searches, all the legal words (and the words patterns match) are counted together
+    legal_words = []
+    for word in manifest.get("queries", []):
+        if is_positional_query(word):
+            error = positional_query_error(word)
+        else:
+            error = legal_pattern_error(word) if is_pattern(word) else legal_word_error(word)
+        if error:
+            results["invalid_queries"].append({"word": word, "error": error})
+        elif is_positional_query(word):
+            # Phrases and words near each other aren't part of the exit summary
+            query_words, distance = parse_positional_query(word)
+            found = corpus.positional_search(query_words, distance)
+            search = {"phrase": " ".join(word.split()),
+                      "counts": {filename: count for filename, count, _ in found}}
+            if distance is not None:
+                search["distance"] = distance
+            results["searches"].append(search)
+            if not quiet:
+                print("\n".join(positional_result_lines(search["phrase"], found)))
+        else:
+            legal_words.append(word)
+    expanded, matches = corpus.expand_search(legal_words)
+    found = corpus.count_words(expanded)
+    searched = list(found)
+    for word in legal_words:
+        for word_lc in matches.get(word, [word.lower()]):
+            totals = found[word_lc]
+            search = {"word": word_lc, "counts": dict(totals)}
+            if word in matches:
+                search["pattern"] = word
+            results["searches"].append(search)
+            if not quiet:
+                print("\n".join(search_result_lines(word_lc, totals)))
+
+    # Concordance and extra lists for all the files
+    if manifest.get("concordance", True) and len(corpus) > 0:
+        concordance_path = os.path.join(output_dir, "CONCORDANCE.TXT")
+        extra_lists_path = os.path.join(output_dir, "ExtraLists.txt")
+        if store is not None:
+            # Streamed from the database, never all in memory
+            corpus.write_concordance(concordance_path, echo=echo)
+            corpus.write_extra_lists(extra_lists_path, echo=echo)
+        else:
+            workers = manifest.get("workers", 1)
+            if workers == 1:
+                concordance = build_concordance_from_positions(
+                    corpus.words_arrays(), [f.lines for f in corpus], corpus.vocab, order=corpus.sorted_words)
+            else:
+                concordance = build_concordance(corpus.filenames, workers=workers,
+                                                order=corpus.sorted_words)
+            write_concordance(concordance, concordance_path, echo=echo)
+            write_extra_lists(concordance, corpus.filenames, corpus.words_arrays(), corpus.vocab,
+                              dest=extra_lists_path, echo=echo)
+        results["concordance"] = concordance_path
+        results["extra_lists"] = extra_lists_path
+
+    if not quiet and searched and len(corpus) > 0:
+        # The counts are given, so the files' word indexes aren't needed
+        print_summary_words(searched, corpus.filenames, None, found=corpus.count_words(searched))
+
+    results_path = os.path.join(output_dir, manifest.get("results", RESULTS_NAME))
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run SG3 on manifests of files and queries, without the GUI")
+    parser.add_argument("manifests", nargs="+", help="JSON manifest files")
+    parser.add_argument("--quiet", action="store_true",
+                        help="only print one line per output file instead of the tables and every line")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the parsed file cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"parsed file cache (default {CACHE_DIR})")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="write the time spent in each stage (for all manifests) to FILE as JSON")
+    parser.add_argument("--tokenizer", choices=list(TOKENIZERS), default=TOKENIZER.name,
+                        help=f"engine that splits files into words (default {TOKENIZER.name})")
+    parser.add_argument("--store", metavar="FILE",
+                        help="keep the parsed files in the SQLite database FILE instead of in memory")
+    args = parser.parse_args(argv)
+    STATS.enabled = bool(args.stats)
+    set_tokenizer(args.tokenizer)
+
+    cache = None if args.no_cache else ParseCache(args.cache_dir)
+    store = SqliteStore(args.store) if args.store else None
+    exit_code = 0
+    for path in args.manifests:
+        try:
+            manifest = load_manifest(path)
+            results = run_manifest(manifest, os.path.dirname(path) or ".", cache, args.quiet, store)
+        except Exception as e:
+            print(f"ERROR: {path}: {e}", file=sys.stderr)
+            exit_code = 1
+            continue
+        if results["failed"]:
+            exit_code = 1
+            for failure in results["failed"]:
+                print(f"ERROR: {path}: could not read '{failure['name']}': {failure['error']}",
+                      file=sys.stderr)
+    if store is not None:
+        store.close()
+    if args.stats:
+        STATS.dump(args.stats)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
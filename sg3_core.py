@@ -0,0 +1,2174 @@
+"""
+Text processing for SG3: reading and parsing files, word counts and searches,
+concordances and the extra lists. Nothing here uses Tk, so it can be imported
+by sg3_batch.py, worker processes and scripts without a display.
+"""
+import sys
+import os
+import io
+import re
+import codecs
+import time
+import json
+import threading
+import heapq
+import bisect
+import zlib
+import glob
+import fnmatch
+import pickle
+from array import array
+from collections import Counter, OrderedDict
+from itertools import repeat, chain
+
+max_input_files = 10
+READ_CHUNK_SIZE = 1024 * 1024 # Characters read at a time when streaming a file
+OUTPUT_BUFFER_SIZE = 256 * 1024 # Characters collected before each write of an output file
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".sg3_cache") # Parsed files are kept here
+CACHE_MAX_BYTES = 512 * 1024 * 1024 # Least recently used files are removed past this size
+CACHE_EVICT_TO = 0.9 # Share of CACHE_MAX_BYTES the cache is cut down to, so it isn't full again on the next file
+SEARCH_CACHE_SIZE = 10000 # Words whose search results are remembered
+WATCH_INTERVAL = 1.0 # Seconds between checks of the open files for changes on disk
+intro = (
+    "This program will allow an input of up to 10 text files (.TXT).\n"
+    "Each file will be parsed into separate words (Case-insensitive letters A-Z and optional hyphens are allowed)\n"
+    "This program will display a total and a distinct word count per file.\n"
+    "Words may be searched to see how many times they occur in each file.\n"
+    "A summary table of all searches for all files will be displayed at the end."
+)
+
+outro = "Program has finished executing."
+
+class Stats:
+    """
+    Optional wall time and counters for the slow stages: reading files,
+    extract_words, the file table, searches, building and sorting the
+    concordance and writing the output files.
+    Off by default. While off, start() returns None and stop() returns right
+    away, so each stage only costs two method calls.
+    Worker processes used by build_concordance keep their own stats, which
+    aren't collected here.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._stages = {}
+        self._lock = threading.Lock() # Files are read on a worker thread
+
+    def start(self):
+        """ Returns the start time of a stage, or None while stats are off """
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, started, name, words=0, size=0):
+        """
+        Records one call of the stage begun with start().
+        words is how many words (or output lines) it handled, size how many characters.
+        """
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = {"calls": 0, "seconds": 0.0, "words": 0, "bytes": 0}
+            stage["calls"] += 1
+            stage["seconds"] += elapsed
+            stage["words"] += words
+            stage["bytes"] += size
+
+    def snapshot(self):
+        """ Returns a copy of the stages as {name: {calls, seconds, words, bytes}} """
+        with self._lock:
+            return {name: dict(stage) for name, stage in self._stages.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def to_json(self):
+        return json.dumps({"enabled": self.enabled, "stages": self.snapshot()}, indent=2)
+
+    def dump(self, dest):
+        """ Writes the stats as JSON to dest (a path or file-like object) """
+        if isinstance(dest, (str, bytes, os.PathLike)):
+            with open(dest, "w", encoding="utf-8") as f:
+                f.write(self.to_json())
+        else:
+            dest.write(self.to_json())
+
+    def table_lines(self):
+        """ Lines of a table of the stages, for the stats panel """
+        rows = [["Stage", "Calls", "Seconds", "Words", "Bytes"]]
+        for name, stage in self.snapshot().items():
+            rows.append([name, stage["calls"], f"{stage['seconds']:.4f}",
+                         stage["words"], stage["bytes"]])
+        col_widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+        row_format = "{:<%d} " % col_widths[0] + " ".join("{:>%d}" % w for w in col_widths[1:])
+        return [row_format.format(*row) for row in rows]
+
+STATS = Stats() # Shared by every stage in this module
+
+class LazyPattern:
+    """
+    A regular expression that is only compiled the first time it is used, so
+    importing this module (in worker processes, batch jobs and tests) doesn't
+    compile patterns that may never be needed. Has the methods of re.Pattern.
+    """
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags
+
+    def __getattr__(self, name):
+        # Only called for names not found yet: keep the compiled pattern's
+        # attribute on the object so later lookups are plain attribute lookups
+        value = getattr(re.compile(self.pattern, self.flags), name)
+        setattr(self, name, value)
+        return value
+
+# Words are runs of letters, joined by single hyphens
+WORD_PATTERN = r"[A-Za-z]+(?:-[A-Za-z]+)*"
+WORD_RE = LazyPattern(WORD_PATTERN)
+LINE_BREAK_RE = LazyPattern(r"-\n") # A word split over two lines
+
+class Tokenizer:
+    """
+    Splits text into words and the line each word starts on.
+    A word split over a line break with a hyphen ("-\\n") is joined back together
+    and counts as being on its first line.
+    Subclasses say how a binary file is turned into text (_read_blocks) and how
+    that text is split (_words and _positions); every engine gives the same words.
+    """
+    name = None
+
+    def words(self, text):
+        """ Returns the array of words in text """
+        started = STATS.start()
+        words_array = self._words(text)
+        STATS.stop(started, "extract_words", len(words_array), len(text))
+        return words_array
+
+    def word_positions(self, text, first_line=1):
+        """
+        Returns (words_array, lines_array) with the line number of each word.
+        first_line is the line number of the start of text (for text read in pieces).
+        """
+        started = STATS.start()
+        words_array, lines_array = self._positions(text, first_line)
+        STATS.stop(started, "extract_words", len(words_array), len(text))
+        return words_array, lines_array
+
+    def iter_chunks(self, f, chunk_size=READ_CHUNK_SIZE, lower=False):
+        """
+        Streams words and their line numbers from a file opened in binary mode
+        (read as UTF-8, with any kind of line ending).
+        Reads chunk_size bytes at a time, so memory stays fixed no matter how big
+        the file is. Words and hyphenated line breaks that run over the end of a chunk
+        are held back and parsed with the next chunk.
+        If lower is True the words are lowercased.
+        Yields (words_array, lines_array) for each chunk read (arrays may be empty).
+        """
+        pending = ""
+        line_num = 1
+        for block in self._read_blocks(f, chunk_size, lower):
+            text = pending + block
+            cut = _safe_cut(text)
+            piece, pending = text[:cut], text[cut:]
+            yield self._chunk_positions(piece, line_num)
+            line_num += piece.count("\n")
+        if pending:
+            yield self._chunk_positions(pending, line_num)
+
+    def _chunk_positions(self, text, first_line):
+        started = STATS.start()
+        words_array, lines_array = self._block_positions(text, first_line)
+        STATS.stop(started, "extract_words", len(words_array), len(text))
+        return words_array, lines_array
+
+    def _read_blocks(self, f, chunk_size, lower):
+        """ Yields the text of each block read """
+        raise NotImplementedError
+
+    def _words(self, text):
+        raise NotImplementedError
+
+    def _positions(self, text, first_line):
+        raise NotImplementedError
+
+    # Same as _positions, for text that came from _read_blocks
+    def _block_positions(self, text, first_line):
+        return self._positions(text, first_line)
+
+    # Words of lines joined at hyphenated line breaks, with the line each one starts on
+    @staticmethod
+    def _joined_positions(lines, start_line):
+        """
+        lines - the lines of one hyphenated word, every one but the last ending in "-"
+        Returns (words_array, lines_array)
+        """
+        # Remove hyphen and newline by joining the lines,
+        # remembering where each line break was removed
+        parts = []
+        breaks = []
+        length = 0
+        for line in lines[:-1]:
+            parts.append(line[:-1])
+            length += len(line) - 1
+            breaks.append(length)
+        parts.append(lines[-1])
+        words_array = []
+        lines_array = []
+        for match in WORD_RE.finditer("".join(parts)):
+            words_array.append(match.group())
+            lines_array.append(start_line + bisect.bisect_right(breaks, match.start()))
+        return words_array, lines_array
+
+class RegexTokenizer(Tokenizer):
+    """
+    The plain engine: the file is decoded as text and each line is searched with
+    the word regular expression.
+    """
+    name = "regex"
+
+    def _read_blocks(self, f, chunk_size, lower):
+        text_f = io.TextIOWrapper(f, encoding="utf-8")
+        try:
+            while True:
+                started = STATS.start()
+                chunk = text_f.read(chunk_size)
+                STATS.stop(started, "read file", size=len(chunk))
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            text_f.detach() # Leave f open for the caller
+
+    def iter_chunks(self, f, chunk_size=READ_CHUNK_SIZE, lower=False):
+        for words_array, lines_array in Tokenizer.iter_chunks(self, f, chunk_size):
+            if lower:
+                words_array = [word.lower() for word in words_array]
+            yield words_array, lines_array
+
+    def _words(self, text):
+        return WORD_RE.findall(LINE_BREAK_RE.sub("", text))
+
+    def _positions(self, text, first_line):
+        words_array = []
+        lines_array = []
+        findall = WORD_RE.findall
+        lines = text.split("\n")
+        last = len(lines) - 1
+        line_num = first_line
+        i = 0
+        while i <= last:
+            line = lines[i]
+            if i == last or not line.endswith("-"):
+                # Most lines: every word found is on this line
+                found = findall(line)
+                words_array += found
+                lines_array += repeat(line_num, len(found))
+                line_num += 1
+                i += 1
+                continue
+            # Collect the lines of a hyphenated line break
+            j = i
+            while j < last and lines[j].endswith("-"):
+                j += 1
+            found, found_lines = self._joined_positions(lines[i:j + 1], line_num)
+            words_array += found
+            lines_array += found_lines
+            line_num += j - i + 1
+            i = j + 1
+        return words_array, lines_array
+
+# Byte tables for FastTokenizer: letters, hyphens and newlines are kept and
+# every other byte (including each byte of a non-ASCII character) becomes a space
+_LETTERS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_KEEP_TABLE = bytes(ch if ch in _LETTERS + b"-\n" else 32 for ch in range(256))
+_LOWER_TABLE = _KEEP_TABLE.translate(bytes.maketrans(_LETTERS[:26], _LETTERS[26:]))
+
+class FastTokenizer(Tokenizer):
+    """
+    The optimized engine. Each block of bytes is turned into plain ASCII (letters,
+    hyphens, newlines and spaces, and lowercased if asked) by one bytes.translate,
+    so words can be split with str.split instead of the regular expression.
+    ASCII letters never appear inside a UTF-8 encoded character, so this gives
+    the same words as RegexTokenizer. Blocks that aren't pure ASCII are still
+    checked to be valid UTF-8.
+    """
+    name = "fast"
+
+    def _read_blocks(self, f, chunk_size, lower):
+        table = _LOWER_TABLE if lower else _KEEP_TABLE
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        carriage_return = False
+        while True:
+            started = STATS.start()
+            raw = f.read(chunk_size)
+            STATS.stop(started, "read file", size=len(raw))
+            if not raw.isascii() or decoder.getstate()[0]:
+                decoder.decode(raw) # Raises UnicodeDecodeError like reading as text would
+            if not raw:
+                decoder.decode(b"", final=True)
+            # Line endings are read like text mode does: \r\n and \r become \n.
+            # A \r at the end of a block waits to see if a \n comes next.
+            block = b"\r" + raw if carriage_return else raw
+            carriage_return = bool(raw) and block.endswith(b"\r")
+            if carriage_return:
+                block = block[:-1]
+                if not block:
+                    continue
+            if b"\r" in block:
+                block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            if block:
+                yield block.translate(table).decode("ascii")
+            if not raw:
+                break
+
+    def _words(self, text):
+        plain = text.encode("utf-8").translate(_KEEP_TABLE).decode("ascii").replace("-\n", "")
+        # A hyphen next to anything but a letter needs the regex ("--\n" leaves a "-\n" behind)
+        if ("--" in plain or " -" in plain or "- " in plain or "\n-" in plain or "-\n" in plain
+                or plain[:1] == "-" or plain[-1:] == "-"):
+            return WORD_RE.findall(plain)
+        return plain.split()
+
+    def _positions(self, text, first_line):
+        return self._block_positions(text.encode("utf-8").translate(_KEEP_TABLE).decode("ascii"), first_line)
+
+    def _block_positions(self, text, first_line):
+        lines = text.split("\n")
+        if "-" in text and self._fix_hyphens(text, lines, first_line):
+            text = "\n".join(lines)
+        words_array = text.split()
+        lines_array = list(chain.from_iterable(
+            map(repeat, range(first_line, first_line + len(lines)), map(len, map(str.split, lines)))))
+        return words_array, lines_array
+
+    def _fix_hyphens(self, text, lines, first_line):
+        """
+        str.split keeps every hyphen, so the lines with a hyphen that isn't between
+        two letters, and the lines of hyphenated line breaks, are replaced by their
+        correct words joined with spaces.
+        Returns True if any line was changed.
+        """
+        changed = False
+        last = len(lines) - 1
+        # Lines ending in "-" are found from the "-\n" in text, not by looking at every line
+        line = 0
+        searched = 0
+        pos = text.find("-\n")
+        while pos >= 0:
+            changed = True
+            line += text.count("\n", searched, pos)
+            j = line
+            while j < last and lines[j].endswith("-"):
+                j += 1
+            joined = lines[line][:-1] + lines[j]
+            if j == line + 1 and not ("--" in joined or " -" in joined or "- " in joined
+                                      or joined[:1] == "-" or joined[-1:] == "-"):
+                # Two lines and no stray hyphens: the words that start before the break are on the first line
+                words = joined.split()
+                first_count = len(joined[:len(lines[line]) - 1].split())
+                lines[line] = " ".join(words[:first_count])
+                lines[j] = " ".join(words[first_count:])
+            else:
+                found, found_lines = self._joined_positions(lines[line:j + 1], line)
+                per_line = [[] for _ in range(line, j + 1)]
+                for word, line_num in zip(found, found_lines):
+                    per_line[line_num - line].append(word)
+                lines[line:j + 1] = map(" ".join, per_line)
+            # Carry on after the joined lines
+            searched = pos
+            for _ in range(line, j):
+                searched = text.index("\n", searched) + 1
+            line = j
+            pos = text.find("-\n", searched)
+        # Then any other line with a stray hyphen (the joined lines above have none left)
+        if "--" in text or " -" in text or "- " in text or "\n-" in text or text[0] == "-" or text[-1] == "-":
+            for i, line in enumerate(lines):
+                if "-" in line and ("--" in line or " -" in line or "- " in line
+                                    or line[0] == "-" or (i == last and line[-1] == "-")):
+                    lines[i] = " ".join(WORD_RE.findall(line))
+                    changed = True
+        return changed
+
+TOKENIZERS = {engine.name: engine for engine in (RegexTokenizer, FastTokenizer)}
+TOKENIZER = FastTokenizer() # The engine used by the functions below
+
+def set_tokenizer(name):
+    """ Chooses the tokenizer engine by name ("regex" or "fast") """
+    global TOKENIZER
+    if name not in TOKENIZERS:
+        raise ValueError(f"tokenizer must be one of {', '.join(TOKENIZERS)}, not {name!r}")
+    TOKENIZER = TOKENIZERS[name]()
+
+def extract_words(text):
+    """
+    Splits text into words while removing the line-break hyphens
+    Returns an array of words.
+    """
+    return TOKENIZER.words(text)
+
+def extract_word_positions(text, first_line=1):
+    """
+    Splits text into words exactly like extract_words, and also records the
+    line (of the original text) that each word starts on.
+    A word joined across a hyphenated line break counts as being on its first line.
+    first_line is the line number of the start of text (for text read in pieces).
+    Returns (words_array, lines_array) with one line number per word.
+    """
+    return TOKENIZER.word_positions(text, first_line)
+
+# Last index to cut text at so both sides can be parsed separately:
+# after any character that can't be part of a word or a hyphenated line break
+def _safe_cut(text):
+    i = len(text) - 1
+    while i >= 0:
+        ch = text[i]
+        if ch == "\n":
+            if i == 0 or text[i - 1] != "-":
+                return i + 1
+        elif not (ch == "-" or "a" <= ch <= "z" or "A" <= ch <= "Z"):
+            return i + 1
+        i -= 1
+    return 0
+
+def iter_word_chunks(f, chunk_size=READ_CHUNK_SIZE, lower=False):
+    """
+    Streams words and their line numbers from a file opened in binary mode,
+    with the current tokenizer engine (see Tokenizer.iter_chunks).
+    Yields (words_array, lines_array) for each chunk read (arrays may be empty).
+    """
+    return TOKENIZER.iter_chunks(f, chunk_size, lower)
+
+def iter_word_positions(f, chunk_size=READ_CHUNK_SIZE, lower=False):
+    """
+    Same as iter_word_chunks but yields one (word, line number) pair at a time.
+    """
+    for words, lines in iter_word_chunks(f, chunk_size, lower):
+        yield from zip(words, lines)
+
+'''
+call this in get_legal_word function according to SG1 specifications
+If the user types in a string that contains any other characters,
+SG1 should point out the FIRST problem in the string and politely reprompt
+'''
+
+def first_invalid_ch(word):
+    """
+    Returns the first character that isn't a letter (a-z) or hyphen '-'
+    and returns none if all the characters are valid
+    """
+
+    legal = set("abcdefghijklmnopqrstuvwxyz-")
+    for ch in word.lower():
+        if ch not in legal:
+            return ch
+    return None
+
+# Checks a word typed in by the user
+def legal_word_error(word):
+    """
+    Returns None if word is a legal word, otherwise the message explaining
+    the FIRST problem with it
+    """
+    if WORD_RE.fullmatch(word):
+        return None
+    invalid_char = first_invalid_ch(word)
+    if invalid_char:
+        return (f"Invalid character '{invalid_char}' found. "
+                "Word must only contain letters A-Z and optional hyphens.")
+    return "Word must only contain letters A-Z and optional hyphens."
+
+# Wildcards allowed in search patterns: * is any run of characters, ? is one character
+WILDCARDS = "*?"
+
+def is_pattern(word):
+    return any(ch in word for ch in WILDCARDS)
+
+# Checks a search pattern like inter* or *-based typed in by the user
+def legal_pattern_error(pattern):
+    """
+    Returns None if pattern is a legal word with wildcards, otherwise the message
+    explaining the FIRST problem with it
+    """
+    invalid_char = first_invalid_ch(pattern.translate({ord(ch): None for ch in WILDCARDS}))
+    if invalid_char:
+        return (f"Invalid character '{invalid_char}' found. Pattern must only contain "
+                "letters A-Z, hyphens and the wildcards * and ?.")
+    if not any(ch.isalpha() for ch in pattern):
+        return "Pattern must contain at least one letter."
+    return None
+
+# A phrase is several words separated by spaces, a proximity search is
+# two words and the most words apart they can be, like "whale ~5 sea"
+NEAR_RE = LazyPattern(r"(\S+)\s+~(\d+)\s+(\S+)")
+
+def is_positional_query(query):
+    return len(query.split()) > 1
+
+def parse_positional_query(query):
+    """
+    Splits a phrase or proximity search typed in by the user.
+    Returns (words, distance), distance is None for a phrase
+    """
+    match = NEAR_RE.fullmatch(query.strip())
+    if match:
+        return [match.group(1), match.group(3)], int(match.group(2))
+    return query.split(), None
+
+def positional_query_error(query):
+    """
+    Returns None if query is a legal phrase or proximity search, otherwise the
+    message explaining the FIRST problem with it
+    """
+    words, distance = parse_positional_query(query)
+    if distance is None and "~" in query:
+        return "A search for words near each other must look like whale ~5 sea."
+    if distance == 0:
+        return "The distance between the words must be at least 1."
+    for word in words:
+        error = legal_word_error(word)
+        if error:
+            return f"'{word}': {error}"
+    return None
+
+def get_legal_word():
+    """
+    Prompt the user for a legal word and give the definition of a legal word
+    Rules for a legal word:
+        -Only letters A-Z (case-insensitive)
+        -Optional hyphens are allowed
+        -No spaces, punctuation, or numbers allowed
+    Returns the valid word (lowercased)
+    """
+    while True:
+        print("Legal words may only contain letters (A-Z) and optional hyphens (-).\nA word is defined as a series of alphabetic characters, uninterrupted by a blank or a punctuation mark (excluding a hyphen).")
+        word = input("Enter a legal word: ").strip()
+        # Regex validates word based on rules
+        if WORD_RE.fullmatch(word):
+            return word.lower()
+        else:
+            invalid_char = first_invalid_ch(word)
+            if invalid_char:
+                print(f"Error: Invalid character '{invalid_char}' found. Word must only contain legal characters: abcdefghijklmnopqrstuvwxyz-")
+            else:
+                print("Error: Word must only contain legal characters: abcdefghijklmnopqrstuvwxyz-")
+
+def ask_another_file():
+    """
+    Ask User if they want to add another file. Will accept Yes/No (Y/N) which is made case insensitive
+    Loop until a valid response is given
+    """
+    while True:
+        response = input("Do you want to add another file? (Yes/No): ").strip().lower()
+        if response in ["yes", "y"]:
+            return True
+        elif response in ["no", "n"]:
+            return False
+        else:
+            print("Error: Please enter Yes, No, Y, or N.")
+        
+def ask_continue():
+    """
+    Ask user if they want to continue. Will accept Yes/No (Y/N) which is made case insensitive
+    Loop until a valid response is given
+    """
+    while True:
+        response = input("Do you want to continue? (Yes/No): ").strip().lower()
+        if response in ["yes", "y"]:
+            return True
+        elif response in ["no", "n"]:
+            return False
+        else:
+            print("Error: Please enter Yes, No, Y, or N.")
+
+class Vocabulary:
+    """
+    Shared table of every word spelling found in the open files.
+    Each spelling gets an integer id so a file's words can be stored in a
+    compact array('I') instead of a list of strings.
+    lower_ids maps the id of a spelling to the id of its lowercased spelling,
+    which is what searches and the concordance use.
+    Ids are never reused, so closing a file leaves its spellings in the table.
+    """
+    def __init__(self):
+        self._ids = {}
+        self.words = []
+        self.lower_ids = array('I')
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        """ Returns the id of word, adding it if it is new """
+        word_id = self._ids.get(word)
+        if word_id is None:
+            lower = word.lower()
+            lower_id = self.add(lower) if lower != word else len(self.words)
+            word_id = len(self.words)
+            self._ids[word] = word_id
+            self.words.append(word)
+            self.lower_ids.append(lower_id)
+        return word_id
+
+    def get(self, word):
+        """ Returns the id of word, or None if it has never been seen """
+        return self._ids.get(word)
+
+    def encode(self, words):
+        """ Returns the ids of an array of words as an array('I') """
+        return array('I', map(self.add, words))
+
+    def import_ids(self, words, word_ids):
+        """
+        Converts word ids of another vocabulary into ids of this one.
+        words is the other vocabulary's words list.
+        """
+        table = array('I', map(self.add, words))
+        if table == array('I', range(len(table))):
+            # Both vocabularies gave the words the same ids (e.g. the first file opened)
+            return word_ids
+        return array('I', map(table.__getitem__, word_ids))
+
+    def decode(self, word_ids, lower=False):
+        """ Returns the words for an array of ids (lowercased if lower is True) """
+        words = self.words
+        if lower:
+            lower_ids = self.lower_ids
+            return [words[lower_ids[i]] for i in word_ids]
+        return [words[i] for i in word_ids]
+
+def build_word_index(words_array, vocab=None):
+    """
+    Builds the frequency index for one file's word array.
+    Words are lowercased once here so searches don't have to lowercase every token.
+    If vocab is given, words_array is an array of ids from that Vocabulary.
+    Returns a Counter of {lowercased word: count}
+    """
+    if vocab is None:
+        return Counter(word.lower() for word in words_array)
+    # Count the ids first, then only lowercase each distinct spelling once
+    return _lowercase_index(Counter(words_array), vocab)
+
+# Frequency index of lowercased words from the counts of each spelling id
+def _lowercase_index(spelling_counts, vocab):
+    index = Counter()
+    for word_id, count in spelling_counts.items():
+        index[vocab.words[vocab.lower_ids[word_id]]] += count
+    return index
+
+def count_word(filenames, word_indexes, counted_word):
+    """
+    Counts words using each file's frequency index for displaying total.
+    Parameters:
+        filenames - array of filenames
+        word_indexes - array of frequency indexes (from build_word_index)
+        counted_word - the word to count
+    Returns list of [filename, count] pairs for each file
+    """
+    started = STATS.start()
+    counted_word = counted_word.lower()
+    totals = []
+    for index, word_index in enumerate(word_indexes):
+        filename = filenames[index]
+        total = word_index.get(counted_word, 0)
+        totals.append([filename, total])
+    STATS.stop(started, "count_word")
+    return totals
+
+def count_words(filenames, word_indexes, counted_words):
+    """
+    Counts a list of words in one pass over the files' frequency indexes.
+    Repeated words are only counted once.
+    Returns a dictionary of {lowercased word: [filename, count] pairs like count_word},
+    in the order the words were given
+    """
+    started = STATS.start()
+    words = list(dict.fromkeys(word.lower() for word in counted_words))
+    results = {word: [] for word in words}
+    for filename, word_index in zip(filenames, word_indexes):
+        get_count = word_index.get
+        for word in words:
+            results[word].append([filename, get_count(word, 0)])
+    STATS.stop(started, "count_word", len(words))
+    return results
+
+# Concordance order puts a hyphen before the letters ("sea-side" before "seaside")
+def collation_key(word):
+    return word.replace("-", " ")
+
+class SortedVocabulary:
+    """
+    The distinct lowercased words of the open files in concordance order, kept up to
+    date as files are opened and closed instead of sorted again for every concordance.
+    Each word's collation key is computed once, when the word is inserted (by
+    bisection, or by one merge when a file brings many new words), and a word is
+    removed when no open file uses it any more.
+    """
+    BULK_INSERT = 100 # More new words than this are merged in with one sort
+
+    def __init__(self):
+        self._entries = [] # Sorted (collation key, word) pairs
+        self._file_counts = Counter() # word -> number of open files that have it
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, word):
+        return word in self._file_counts
+
+    def words(self):
+        """ Returns the words, in concordance order """
+        return [word for _, word in self._entries]
+
+    def add(self, words):
+        """ Adds the distinct words of a file that was opened (a list or a dict's keys) """
+        file_counts = self._file_counts
+        new_entries = [(collation_key(word), word) for word in words if word not in file_counts]
+        file_counts.update(words)
+        if len(new_entries) > self.BULK_INSERT:
+            new_entries.sort()
+            # Sorting two sorted runs only merges them
+            self._entries = sorted(self._entries + new_entries)
+        else:
+            for entry in new_entries:
+                bisect.insort(self._entries, entry)
+
+    def remove(self, words):
+        """ Removes the distinct words of a file that was closed """
+        file_counts = self._file_counts
+        gone = []
+        for word in words:
+            if file_counts[word] > 1:
+                file_counts[word] -= 1
+            else:
+                del file_counts[word]
+                gone.append(word)
+        if len(gone) > self.BULK_INSERT:
+            self._entries = [entry for entry in self._entries if entry[1] in file_counts]
+        else:
+            entries = self._entries
+            for word in gone:
+                del entries[bisect.bisect_left(entries, (collation_key(word),))]
+
+    def ordered(self, concordance):
+        """
+        Returns the entries of a concordance (or any dict keyed by lowercased word)
+        in concordance order, or None if it has a word that isn't in the vocabulary
+        or has so few of its words that sorting them is quicker.
+        """
+        if not len(self._entries) // 4 <= len(concordance) <= len(self._entries):
+            return None
+        ordered = {word: concordance[word] for _, word in self._entries if word in concordance}
+        return ordered if len(ordered) == len(concordance) else None
+
+class WordListIndex:
+    """
+    The distinct (lowercased) words of the open files kept sorted, plus the same
+    words spelled backwards and sorted, so words with a given prefix or suffix
+    are found with bisect in time proportional to the number of matches.
+    """
+    def __init__(self, words):
+        self.words = sorted(words)
+        self.reversed_words = sorted(word[::-1] for word in self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def with_prefix(self, prefix):
+        """ Returns the words starting with prefix, in order """
+        return _prefix_range(self.words, prefix)
+
+    def with_suffix(self, suffix):
+        """ Returns the words ending with suffix, in order """
+        return sorted(word[::-1] for word in _prefix_range(self.reversed_words, suffix[::-1]))
+
+    def expand(self, pattern):
+        """
+        Returns the words matching a pattern with * and ? wildcards, in order.
+        The longer of the pattern's literal prefix and suffix picks the candidates,
+        which are then checked against the whole pattern.
+        """
+        pattern = pattern.lower()
+        first = min(pattern.find(ch) for ch in WILDCARDS if ch in pattern)
+        last = max(pattern.rfind(ch) for ch in WILDCARDS)
+        prefix, suffix = pattern[:first], pattern[last + 1:]
+        if len(prefix) >= len(suffix):
+            candidates = self.with_prefix(prefix)
+            if pattern == prefix + "*":
+                return candidates
+        else:
+            candidates = self.with_suffix(suffix)
+            if pattern == "*" + suffix:
+                return candidates
+        return [word for word in candidates if fnmatch.fnmatchcase(word, pattern)]
+
+# Slice of a sorted list of words that start with prefix
+def _prefix_range(sorted_words, prefix):
+    start = bisect.bisect_left(sorted_words, prefix)
+    end = bisect.bisect_left(sorted_words, prefix + chr(0x10FFFF), start)
+    return sorted_words[start:end]
+
+# Splits the text of the search box into words (separated by commas or new lines)
+def split_word_list(text):
+    return [word.strip() for word in re.split(r"[,\n]", text) if word.strip()]
+
+# Lines shown for the result of one word search (totals from count_word)
+def search_result_lines(word, totals):
+    result_lines = [f"Search results for '{word}':"]
+    for filename, count in totals:
+        result_lines.append(f"  {filename}: {count} occurrence(s)")
+    return result_lines
+
+# Results of Corpus.positional_search, with the first locations in each file
+def positional_result_lines(query, results):
+    result_lines = [f"Search results for '{query}':"]
+    for filename, count, locations in results:
+        line = f"  {filename}: {count} occurrence(s)"
+        if count:
+            more = "; ..." if count > len(locations) // 3 else ""
+            line += " at " + format_locations(locations) + more
+        result_lines.append(line)
+    return result_lines
+
+# This checks if the filename ends with .TXT (case-insensitive)
+def txt_filename(filename):
+    name, extension = os.path.splitext(filename)
+    return extension.upper() == ".TXT"
+
+# This ask the user for a file and checks to make sure it hasn't been used already
+# This also make sure the file is .TXT and exists in the directory
+def prompt_for_filename(used_names):
+    while True:
+        filename = input("Please enter a file ending with .TXT: ").strip()
+        if not txt_filename(filename):
+            print("ERROR, filename must end in .TXT.")
+        elif not os.path.isfile(filename):
+            print("ERROR, this file doesn't exist in directory.")
+        elif filename in used_names:
+            print("ERROR, file has already been used.")
+        else:
+            return filename
+
+# Turns what the user typed into the list of files to open
+def expand_file_pattern(pattern):
+    """
+    A directory opens every .TXT file in it and a glob pattern (with * ? or [)
+    opens every .TXT file it matches, both sorted by name.
+    Anything else, including a file whose name has * ? or [ in it, is treated
+    as a single filename.
+    """
+    if os.path.isfile(pattern):
+        return [pattern]
+    if os.path.isdir(pattern):
+        names = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))]
+    elif re.search(r"[*?[]", pattern):
+        names = sorted(glob.glob(pattern))
+    else:
+        return [pattern]
+    return [name for name in names if txt_filename(name) and os.path.isfile(name)]
+
+def print_file_table(filenames, wordlists, distinct_counts=None, totals=None):
+    """
+    Print a table with:
+    Filename, Total Words, and Distinct Words
+    Parameters:
+        filenames-  array of filenames (from user)
+        wordlists - array of an array of words or word ids (extracted from files)
+        distinct_counts - optional distinct word counts of the files if they are
+                          already known (see CorpusFile), so the words aren't gone through again
+        totals - optional (total words, distinct words) of all the files, shown as a last row
+    """
+    started = STATS.start()
+    index = 0
+    rows = []
+    for i, (filename, wordlist) in enumerate(zip(filenames, wordlists)):
+        total_words = len(wordlist)
+        distinct_words = distinct_counts[i] if distinct_counts is not None else len(set(wordlist))
+        row = [filename, total_words, distinct_words]
+        rows.append(row)
+    for line in file_table_lines(rows, totals):
+        print(line)
+    STATS.stop(started, "print_file_table", sum(row[1] for row in rows))
+
+# Lines of the file table, from [filename, total words, distinct words] rows
+def file_table_lines(rows, totals=None):
+    total_row = ["All files", totals[0], totals[1]] if totals is not None else None
+
+    # Width of the colums
+    columns = ["Filename ", "Total Words ", "Distinct Words"]
+    col_widths = [len(c) for c in columns]
+    for row in rows + ([total_row] if total_row else []):
+        for i, c in enumerate(row):
+            col_widths[i] = max(len(str(c)), col_widths[i])
+
+    row_format = ' '.join('{:>%d}' % width for width in col_widths)
+
+    # Header display
+    lines = [row_format.format(*columns), "-" * (sum(col_widths)+ 6)]
+
+    # Rows display
+    for row in rows:
+        lines.append(row_format.format(*row))
+    if total_row:
+        lines.append("-" * (sum(col_widths)+ 6))
+        lines.append(row_format.format(*total_row))
+    return lines
+
+# This should keep the list of words that were extracted from the word_search_array
+# This is for the end stats
+def get_queried_words_from(word_search_array):
+    seen = set()
+    out = []
+    for item in word_search_array:
+        if isinstance(item, tuple) and item:
+            w = str(item[0]).lower()
+        else:
+            w = str(item).lower()
+        if w and w not in seen:
+            seen.add(w)
+            out.append(w)
+    return out
+
+# This is to create a table to present the specific words derived from the files
+# This function also like the files and how many times that word is shown in each 
+# of those files. This is for the end stats
+def print_summary_words(queried_words, filenames, word_indexes, found=None):
+    """
+    found - optional {word: [filename, count] pairs} (from count_words or a
+            SearchCache) that already has the counts, so nothing is recounted
+    """
+    if not queried_words:
+        print("\nNo words were queried during this program run.")
+        return
+
+    started = STATS.start()
+    if found is not None:
+        counts = [[w] + [count for _, count in found[w.lower()]] for w in queried_words]
+    else:
+        # Count occurences of each queried word in each of the files (from the frequency indexes)
+        counts = []
+        for w in queried_words:
+            row = []
+            for word_index in word_indexes:
+                cnt = word_index.get(w.lower(), 0)
+                row.append(cnt)
+            counts.append([w] + row)
+
+    print("\nSummary of all words queried from files:\n")
+    for line in word_table_lines(counts, filenames):
+        print(line)
+    STATS.stop(started, "print_summary_words", len(counts))
+
+# Lines of a table with a row per word and a column of counts per file
+def word_table_lines(counts, filenames):
+    """
+    counts - array of [word, count in file 1, count in file 2, ...] rows
+    """
+    # Makes headers for table
+    columns = ["Word"] + list(filenames)
+    col_widths = [len(c) for c in columns]
+
+    # Adjust column widths according to data
+    for row in counts:
+        for i, c in enumerate(row):
+            col_widths[i] = max(len(str(c)), col_widths[i])
+
+    # Format string
+    row_format = ' '.join('{:>%d}' % width for width in col_widths)
+
+    lines = [row_format.format(*columns), "-" * (sum(col_widths) +2 * (len(columns) -1))]
+    for row in counts:
+        lines.append(row_format.format(*row))
+    return lines
+        
+# Function to build concordance from files on disk
+def build_concordance(filenames, workers=1, order=None):
+    """
+    Builds the concordance of one or more files, numbered 1, 2, ... in the X.Y.Z locations.
+    Files are streamed so only the concordance itself is kept in memory.
+    With workers other than 1, each file is parsed in its own process
+    (workers=None uses every CPU) and the results are merged in file order.
+    order is an optional SortedVocabulary of the words, which saves sorting them.
+    Returns a dictionary of {word: packed locations} sorted alphabetically (see format_locations)
+    """
+    started = STATS.start()
+    concordance = {} # Dictionary for concordance
+    if workers == 1 or len(filenames) < 2:
+        for file_num, filename in enumerate(filenames, start = 1):
+            _add_file_to_concordance(concordance, file_num, filename)
+    else:
+        # Only imported here, it loads multiprocessing which most runs never use
+        from concurrent.futures import ProcessPoolExecutor
+        file_nums = range(1, len(filenames) + 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_file_concordance, file_nums, filenames, repeat(TOKENIZER.name))
+            # Merge in file order so every word's locations stay in file order
+            for part in parts:
+                for word, locations in part.items():
+                    existing = concordance.get(word)
+                    if existing is None:
+                        concordance[word] = locations
+                    else:
+                        existing.extend(locations)
+    concordance = _sort_concordance(concordance, order)
+    STATS.stop(started, "build_concordance")
+    return concordance
+
+# Streams one file into the concordance
+def _add_file_to_concordance(concordance, file_num, filename):
+    with open(filename, "rb") as f:
+        _add_to_concordance(concordance, file_num, iter_word_positions(f, lower=True), str)
+
+# Unsorted concordance of a single file, run in a worker process by build_concordance
+def _file_concordance(file_num, filename, tokenizer_name=None):
+    if tokenizer_name is not None and tokenizer_name != TOKENIZER.name:
+        set_tokenizer(tokenizer_name) # Worker processes don't always share the parent's choice
+    concordance = {}
+    _add_file_to_concordance(concordance, file_num, filename)
+    return concordance
+
+# Function to build concordance from words and line numbers that were already extracted
+def build_concordance_from_positions(wordlists, lineslists, vocab=None, order=None):
+    """
+    Builds the concordance without re-reading the files.
+    Parameters:
+        wordlists - array of word arrays (one per file, in file number order)
+        lineslists - array of line number arrays matching each word array
+        vocab - the Vocabulary, if the word arrays hold word ids
+        order - optional SortedVocabulary of the words, which saves sorting them
+    Returns a dictionary of {word: packed locations} sorted alphabetically (see format_locations)
+    """
+    started = STATS.start()
+    concordance = {} # Dictionary for concordance
+
+    if vocab is None:
+        for file_num, (words, lines) in enumerate(zip(wordlists, lineslists), start = 1):
+            _add_to_concordance(concordance, file_num, zip(words, lines), str.lower)
+    else:
+        # Group by lowercased word id, and only look the words up once at the end
+        for file_num, (words, lines) in enumerate(zip(wordlists, lineslists), start = 1):
+            _add_to_concordance(concordance, file_num, zip(words, lines), vocab.lower_ids.__getitem__)
+        concordance = {vocab.words[word_id]: locations for word_id, locations in concordance.items()}
+    concordance = _sort_concordance(concordance, order)
+    STATS.stop(started, "build_concordance", sum(len(words) for words in wordlists))
+    return concordance
+
+# Adds the location of every (word, line number) pair of one file
+# Locations are packed as file, line and word numbers in a flat array('I') per word
+def _add_to_concordance(concordance, file_num, positions, key):
+    prev_line = 0
+    word_num = 0
+    for word, line_num in positions:
+        # Word numbers restart on every line
+        if line_num != prev_line:
+            prev_line = line_num
+            word_num = 0
+        word_num += 1
+        word = key(word)
+        locations = concordance.get(word)
+        if locations is None:
+            locations = concordance[word] = array('I')
+        locations.append(file_num)
+        locations.append(line_num)
+        locations.append(word_num)
+
+# Turns packed locations into the X.Y.Z text written to CONCORDANCE.TXT
+def format_locations(locations):
+    # One %-format call for the whole word is much faster than formatting each location
+    return "; ".join(["%d.%d.%d"] * (len(locations) // 3)) % tuple(locations)
+
+# Sort the dictionary alphabetically (hyphen comes before 'a')
+# The order of a SortedVocabulary is used when it has every word
+def _sort_concordance(concordance, order=None):
+    started = STATS.start()
+    sorted_concordance = order.ordered(concordance) if order is not None else None
+    if sorted_concordance is None:
+        sorted_concordance = dict(sorted(concordance.items(), key = lambda x: collation_key(x[0])))
+    STATS.stop(started, "sort concordance", len(sorted_concordance))
+    return sorted_concordance
+
+class ConcordanceView:
+    """
+    Random access to the entries of a sorted concordance, for showing a few at a
+    time. Locations are only formatted for the entries that are asked for, and
+    find() looks a word up with bisect, so a huge concordance opens instantly.
+    """
+    def __init__(self, concordance):
+        self._concordance = concordance
+        self.words = list(concordance)
+        self._sort_keys = [collation_key(word) for word in self.words] # Same order as _sort_concordance
+
+    def __len__(self):
+        return len(self.words)
+
+    def rows(self, start, stop, max_locations=50):
+        """
+        Returns (word, occurrences, locations text) for entries start to stop.
+        Only the first max_locations locations of a word are written out.
+        """
+        rows = []
+        for word in self.words[start:stop]:
+            locations = self._concordance[word]
+            count = len(locations) // 3
+            if count > max_locations:
+                text = format_locations(locations[:3 * max_locations]) + f"; ... ({count - max_locations} more)"
+            else:
+                text = format_locations(locations)
+            rows.append((word, count, text))
+        return rows
+
+    def find(self, word):
+        """ Returns the index of word, or of the first entry after where it would be """
+        index = bisect.bisect_left(self._sort_keys, collation_key(word.lower()))
+        return min(index, max(0, len(self.words) - 1))
+
+# Writes lines to a file in large blocks instead of one write (and print) per line
+def write_lines(lines, dest, echo="all", buffer_size=OUTPUT_BUFFER_SIZE):
+    """
+    Parameters:
+        lines - iterable of lines (without the newline)
+        dest - path of the file to write, or an open file-like object
+        echo - "all" prints every line, "summary" prints one line about what
+               was written, "none" prints nothing
+        buffer_size - about how many characters are collected before each write
+    Returns the number of lines written
+    """
+    if echo not in ("all", "summary", "none"):
+        raise ValueError(f"echo must be 'all', 'summary' or 'none', not {echo!r}")
+    if isinstance(dest, (str, bytes, os.PathLike)):
+        with open(dest, "w", encoding="utf-8") as f:
+            count = _write_blocks(lines, f, echo, buffer_size)
+        name = os.fspath(dest)
+    else:
+        count = _write_blocks(lines, dest, echo, buffer_size)
+        name = getattr(dest, "name", "output")
+    if echo == "summary":
+        print(f"Wrote {count} lines to {name}")
+    return count
+
+def _write_blocks(lines, f, echo, buffer_size):
+    count = 0
+    block = []
+    size = 0
+    for line in lines:
+        block.append(line)
+        size += len(line) + 1
+        if size >= buffer_size:
+            count += _flush_block(block, f, echo)
+            block = []
+            size = 0
+    if block:
+        count += _flush_block(block, f, echo)
+    return count
+
+def _flush_block(block, f, echo):
+    block.append("") # So the block ends with a newline
+    text = "\n".join(block)
+    f.write(text)
+    if echo == "all":
+        sys.stdout.write(text)
+    return len(block) - 1
+
+# Lines of CONCORDANCE.TXT, from (word, packed locations) pairs in order
+def concordance_lines(entries):
+    for word, locations in entries:
+        yield f"{word} " + format_locations(locations) + "."
+
+# Concordance function to write to txt file and print
+def write_concordance(concordance, dest="CONCORDANCE.TXT", echo="all", buffer_size=OUTPUT_BUFFER_SIZE):
+    """
+    Writes the concordance to dest (see write_lines for the options).
+    concordance is a sorted dictionary from build_concordance, or (word, packed
+    locations) pairs in order, like a concordance streamed from a database.
+    """
+    started = STATS.start()
+    if isinstance(concordance, dict):
+        concordance = concordance.items()
+    count = write_lines(concordance_lines(concordance), dest, echo, buffer_size)
+    STATS.stop(started, "write_concordance", count)
+    return count
+
+# Lines of ExtraLists.txt
+def extra_lists_lines(concordance_array, filenames, wordlists, vocab=None):
+    all_words = list(concordance_array.keys())
+
+    # One pass over the words of every file to collect the total count,
+    # the number of files each word appears in and the first file it appears in
+    word_totals = Counter()
+    files_appeared = Counter()
+    first_file = {}
+    for file_num, wl in enumerate(wordlists, start=1):
+        file_counts = build_word_index(wl, vocab)
+        word_totals.update(file_counts)
+        files_appeared.update(file_counts.keys())
+        for word in file_counts:
+            first_file.setdefault(word, file_num)
+
+    # Top ten words (nlargest keeps the concordance order for ties like a stable sort)
+    word_counts = [[word, word_totals[word], files_appeared[word]] for word in all_words]
+    top_ten = heapq.nlargest(10, word_counts, key=lambda x: x[1])
+
+    in_all_files = (word for word in all_words if files_appeared[word] == len(wordlists))
+    in_one_file = ((word, first_file[word]) for word in all_words if files_appeared[word] == 1)
+    return extra_lists_report_lines(top_ten, in_all_files, in_one_file)
+
+# The three lists of ExtraLists.txt, from the words already picked for each
+def extra_lists_report_lines(top_ten, in_all_files, in_one_file):
+    """
+    top_ten - (word, total, files appeared in) for the ten most frequent words
+    in_all_files - the words in every file, in concordance order
+    in_one_file - (word, file number) for the words in only one file, in concordance order
+    """
+    # Top ten words
+    yield "1. TOP TEN WORDS (Word | Total | Files Appeared In)"
+    for word, count, files in top_ten:
+        yield f"{word:>15} {count:>10} {files:>10}"
+    yield ""
+
+    # Words appearing at least once in all files
+    yield "2. WORDS APPEARING AT LEAST ONCE IN ALL FILES:"
+    for word in in_all_files:
+        yield f"{word:>15}"
+    yield ""
+
+    # Words appearing only in one file
+    yield "3. WORDS APPEARING IN ONLY ONE FILE (Word | File Number):"
+    for word, file_num in in_one_file:
+        yield f"{word:>15} {file_num:>10}"
+
+# Function to build extra lists
+def write_extra_lists(concordance_array, filenames, wordlists, vocab=None,
+                      dest="ExtraLists.txt", echo="all", buffer_size=OUTPUT_BUFFER_SIZE):
+    """ Writes the extra lists to dest (see write_lines for the options) """
+    started = STATS.start()
+    lines = extra_lists_lines(concordance_array, filenames, wordlists, vocab)
+    count = write_lines(lines, dest, echo, buffer_size)
+    STATS.stop(started, "write_extra_lists", count)
+    return count
+
+# Whether a sorted array has a value
+def _has_position(positions, position):
+    index = bisect.bisect_left(positions, position)
+    return index < len(positions) and positions[index] == position
+
+class PositionalIndex:
+    """
+    Where each lowercased word of one file is: for every lowercased word id, the
+    sorted positions (numbers of the words in the file, from 0) it appears at.
+    Phrases and words near each other are found from these postings lists, by
+    looking the positions of the rarest word up in the other lists with bisect,
+    so the text is never scanned again. Line breaks and punctuation between
+    the words are ignored.
+    """
+    def __init__(self, words, vocab):
+        lower_words = array('I', map(vocab.lower_ids.__getitem__, words))
+        # A stable sort of the positions by word gives every word's positions in order
+        order = array('I', sorted(range(len(lower_words)), key=lower_words.__getitem__))
+        self.postings = {}
+        start = 0
+        for word_id, count in sorted(Counter(lower_words).items()):
+            self.postings[word_id] = order[start:start + count]
+            start += count
+
+    # A list this many times longer than the other is searched with bisect instead of merged
+    BISECT_RATIO = 16
+
+    def phrase(self, word_ids):
+        """ Returns the positions where the words with these ids appear one after another """
+        lists = [self.postings.get(word_id) for word_id in word_ids]
+        if None in lists:
+            return array('I')
+        # Start from the rarest word, each other word's list then removes the
+        # candidate starts that don't have it at its offset
+        rarest = min(range(len(lists)), key=lambda i: len(lists[i]))
+        starts = [position - rarest for position in lists[rarest] if position >= rarest]
+        for offset, positions in enumerate(lists):
+            if offset == rarest or not starts:
+                continue
+            if len(starts) * self.BISECT_RATIO < len(positions):
+                starts = [start for start in starts if _has_position(positions, start + offset)]
+            else:
+                starts = _merge_matches(starts, positions, offset, 0, False)
+        return array('I', starts)
+
+    def near(self, id_a, id_b, distance):
+        """ Returns the positions of word id_a that have word id_b at most distance words away """
+        positions_a = self.postings.get(id_a)
+        positions_b = self.postings.get(id_b)
+        if positions_a is None or positions_b is None:
+            return array('I')
+        same = id_a == id_b # A word isn't near itself, only other uses of it
+        if len(positions_a) * self.BISECT_RATIO < len(positions_b):
+            found = []
+            for position in positions_a:
+                index = bisect.bisect_left(positions_b, position - distance)
+                if same and index < len(positions_b) and positions_b[index] == position:
+                    index += 1
+                if index < len(positions_b) and positions_b[index] <= position + distance:
+                    found.append(position)
+        elif len(positions_b) * self.BISECT_RATIO < len(positions_a):
+            # Collect the uses of id_a around each use of the rarer id_b
+            found = set()
+            for position in positions_b:
+                low = bisect.bisect_left(positions_a, position - distance)
+                high = bisect.bisect_right(positions_a, position + distance)
+                found.update(near for near in positions_a[low:high] if near != position)
+            found = sorted(found)
+        else:
+            found = _merge_matches(positions_a, positions_b, 0, distance, same)
+        return array('I', found)
+
+# Walks two sorted lists together and returns the values of first that have a
+# value of second within distance of value + offset (other than value itself if skip_same)
+def _merge_matches(first, second, offset, distance, skip_same):
+    found = []
+    index = 0
+    end = len(second)
+    for value in first:
+        target = value + offset
+        while index < end and second[index] < target - distance:
+            index += 1
+        other = index
+        if skip_same and other < end and second[other] == target:
+            other += 1
+        if other < end and second[other] <= target + distance:
+            found.append(value)
+    return found
+
+class CorpusFile:
+    """
+    One open file: its word ids, line numbers and frequency index.
+    spelling_counts is a Counter of each word id (spelling) in the file.
+    The PositionalIndex is made by the first phrase search and kept until the file changes.
+    """
+    def __init__(self, name, words, lines, word_index, spelling_counts=None):
+        self.name = name
+        self.words = words
+        self.lines = lines
+        self.word_index = word_index
+        self.spelling_counts = spelling_counts if spelling_counts is not None else Counter(words)
+        self.positions = None
+
+    def positional_index(self, vocab):
+        if self.positions is None:
+            self.positions = PositionalIndex(self.words, vocab)
+        return self.positions
+
+    def locations(self, file_num, positions):
+        """ Returns the X.Y.Z locations of word positions, packed like the concordance's """
+        lines = self.lines
+        locations = array('I')
+        for position in positions:
+            line_num = lines[position]
+            locations.append(file_num)
+            locations.append(line_num)
+            locations.append(position - bisect.bisect_left(lines, line_num) + 1)
+        return locations
+
+    @property
+    def total_words(self):
+        return len(self.words)
+
+    @property
+    def distinct_words(self):
+        """ Distinct spellings, like the file table has always shown """
+        return len(self.spelling_counts)
+
+# Takes amounts away from a Counter, dropping the keys that reach zero
+def _subtract_counts(counter, amounts):
+    for key, amount in amounts.items():
+        left = counter[key] - amount
+        if left > 0:
+            counter[key] = left
+        else:
+            del counter[key]
+
+class CorpusStats:
+    """
+    Totals for all the open files, kept up to date as files are opened and closed.
+    Adding or removing a file only goes through that file's distinct words, so
+    the cost doesn't depend on how many other files are open.
+        total_words - words in all the files
+        word_counts - {lowercased word: count in all the files}
+        doc_freq - {lowercased word: number of files it is in}
+        distinct_spellings - distinct spellings in all the files (like the file table)
+    """
+    def __init__(self):
+        self.total_words = 0
+        self.word_counts = Counter()
+        self.doc_freq = Counter()
+        self._spelling_files = Counter() # word id -> number of files it is in
+        self._top = None # (k, most common words) until the next change
+
+    @property
+    def distinct_words(self):
+        return len(self.word_counts)
+
+    @property
+    def distinct_spellings(self):
+        return len(self._spelling_files)
+
+    def add_file(self, corpus_file):
+        self.total_words += corpus_file.total_words
+        self.word_counts.update(corpus_file.word_index)
+        self.doc_freq.update(corpus_file.word_index.keys())
+        self._spelling_files.update(corpus_file.spelling_counts.keys())
+        self._top = None
+
+    def remove_file(self, corpus_file):
+        self.total_words -= corpus_file.total_words
+        _subtract_counts(self.word_counts, corpus_file.word_index)
+        _subtract_counts(self.doc_freq, dict.fromkeys(corpus_file.word_index, 1))
+        _subtract_counts(self._spelling_files, dict.fromkeys(corpus_file.spelling_counts, 1))
+        self._top = None
+
+    def patch_file(self, removed, added, gone_words, new_words, gone_spellings, new_spellings):
+        """
+        Applies a change to part of one file (see Corpus.apply_patch).
+        removed / added - Counters of the lowercased words taken out and put in
+        gone_words / new_words - lowercased words the file no longer has / didn't have before
+        gone_spellings / new_spellings - the same for word ids
+        """
+        self.total_words += sum(added.values()) - sum(removed.values())
+        _subtract_counts(self.word_counts, removed)
+        self.word_counts.update(added)
+        _subtract_counts(self.doc_freq, dict.fromkeys(gone_words, 1))
+        self.doc_freq.update(new_words)
+        _subtract_counts(self._spelling_files, dict.fromkeys(gone_spellings, 1))
+        self._spelling_files.update(new_spellings)
+        self._top = None
+
+    def top(self, k=10):
+        """
+        Returns the k most frequent words as (word, count, number of files) tuples.
+        Worked out once after each change, then reused.
+        """
+        if self._top is None or self._top[0] < k:
+            most_common = heapq.nsmallest(k, self.word_counts.items(), key=lambda item: (-item[1], item[0]))
+            self._top = (k, [(word, count, self.doc_freq[word]) for word, count in most_common])
+        return self._top[1][:k]
+
+    def summary_lines(self, k=10):
+        """ Lines describing the totals and the top k words """
+        lines = [f"Words in all open files: {self.total_words:,}",
+                 f"Distinct words: {self.distinct_words:,} ({self.distinct_spellings:,} spellings)"]
+        if self.word_counts:
+            lines.append(f"Top {k} words (count, files):")
+            for word, count, files in self.top(k):
+                lines.append(f"  {word:<20} {count:>10,} {files:>5}")
+        return lines
+
+class SearchCache:
+    """
+    Least recently used search results of a Corpus, keyed by (word, corpus version).
+    Each entry keeps the word's count in every open file. When a file is opened or
+    closed the corpus version goes up and every entry is brought up to date by
+    adding or dropping just that file's count, so a repeated search never has to
+    look at the other files again.
+    """
+    def __init__(self, max_entries=SEARCH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # word -> (version, {filename: count})
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, word, version):
+        """ Returns {filename: count} for word at this corpus version, or None """
+        entry = self._entries.get(word)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(word)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, word, version, counts):
+        self._entries[word] = (version, counts)
+        self._entries.move_to_end(word)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def file_added(self, name, word_index, old_version, version):
+        """ Adds the counts of a newly opened file to the entries that were current """
+        for word, (entry_version, counts) in list(self._entries.items()):
+            if entry_version == old_version:
+                counts[name] = word_index.get(word, 0)
+                self._entries[word] = (version, counts)
+
+    def file_removed(self, name, old_version, version):
+        """ Drops the counts of a closed file from the entries that were current """
+        for word, (entry_version, counts) in list(self._entries.items()):
+            if entry_version == old_version:
+                counts.pop(name, None)
+                self._entries[word] = (version, counts)
+
+    def file_changed(self, name, word_index, changed_words, old_version, version):
+        """ Updates the count in one file of the changed words, for the entries that were current """
+        for word, (entry_version, counts) in list(self._entries.items()):
+            if entry_version == old_version:
+                if word in changed_words:
+                    counts[name] = word_index.get(word, 0)
+                self._entries[word] = (version, counts)
+
+    def clear(self):
+        self._entries.clear()
+
+class Corpus:
+    """
+    The open files, kept in the order they were opened and looked up by name in O(1).
+    All files share one Vocabulary. At most max_files files can be open.
+    """
+    def __init__(self, max_files=max_input_files):
+        self.vocab = Vocabulary()
+        self.max_files = max_files
+        self._files = {} # name -> CorpusFile (dicts keep the order files were added)
+        self.sorted_words = SortedVocabulary() # Distinct lowercased words, in concordance order
+        self._word_list = None # WordListIndex of the open files, made when first needed
+        self.version = 0 # Goes up every time a file is opened or closed
+        self.search_cache = SearchCache()
+        self.stats = CorpusStats()
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, name):
+        return name in self._files
+
+    def __iter__(self):
+        return iter(self._files.values())
+
+    def get(self, name):
+        return self._files.get(name)
+
+    @property
+    def filenames(self):
+        return list(self._files)
+
+    def room(self):
+        """ Returns how many more files can be opened """
+        return max(0, self.max_files - len(self._files))
+
+    def add(self, name, words, lines):
+        """ Adds a parsed file (words are ids from self.vocab) """
+        spelling_counts = Counter(words)
+        corpus_file = CorpusFile(name, words, lines, _lowercase_index(spelling_counts, self.vocab),
+                                 spelling_counts)
+        self._files[name] = corpus_file
+        self.stats.add_file(corpus_file)
+        self.sorted_words.add(corpus_file.word_index.keys())
+        self._word_list = None
+        self.version += 1
+        self.search_cache.file_added(name, corpus_file.word_index, self.version - 1, self.version)
+        return corpus_file
+
+    def remove(self, name):
+        corpus_file = self._files.pop(name)
+        self.stats.remove_file(corpus_file)
+        self.sorted_words.remove(corpus_file.word_index.keys())
+        self._word_list = None
+        self.version += 1
+        self.search_cache.file_removed(name, self.version - 1, self.version)
+        return corpus_file
+
+    def apply_patch(self, patch):
+        """
+        Replaces the words of the lines of one file that changed on disk (a FilePatch
+        from FileWatcher) and updates the counts, the statistics and the search cache.
+        Only the changed words are looked at, plus moving the line numbers of the
+        words after them if the number of lines changed.
+        Returns False if the file isn't open any more.
+        """
+        corpus_file = self._files.get(patch.name)
+        if corpus_file is None:
+            return False
+        words, lines = corpus_file.words, corpus_file.lines
+        start = bisect.bisect_left(lines, patch.start + 1)
+        stop = len(lines) if patch.old_stop is None else bisect.bisect_left(lines, patch.old_stop + 1)
+        removed_ids = Counter(words[start:stop])
+        new_ids = self.vocab.encode(patch.words)
+        added_ids = Counter(new_ids)
+        words[start:stop] = new_ids
+        corpus_file.positions = None # Made again by the next phrase search
+        lines[start:stop] = array('I', patch.lines)
+        tail = start + len(new_ids)
+        if patch.line_delta and tail < len(lines):
+            delta = patch.line_delta
+            lines[tail:] = array('I', [line_num + delta for line_num in lines[tail:]])
+
+        # Spellings and lowercased words the file gained or lost
+        spelling_counts = corpus_file.spelling_counts
+        new_spellings = [word_id for word_id in added_ids if word_id not in spelling_counts]
+        _subtract_counts(spelling_counts, removed_ids)
+        spelling_counts.update(added_ids)
+        gone_spellings = [word_id for word_id in removed_ids if word_id not in spelling_counts]
+        removed = _lowercase_index(removed_ids, self.vocab)
+        added = _lowercase_index(added_ids, self.vocab)
+        word_index = corpus_file.word_index
+        new_words = [word for word in added if word not in word_index]
+        _subtract_counts(word_index, removed)
+        word_index.update(added)
+        gone_words = [word for word in removed if word not in word_index]
+        self.stats.patch_file(removed, added, gone_words, new_words, gone_spellings, new_spellings)
+
+        if new_words or gone_words:
+            self.sorted_words.remove(gone_words)
+            self.sorted_words.add(new_words)
+            self._word_list = None
+        self.version += 1
+        self.search_cache.file_changed(patch.name, word_index, removed.keys() | added.keys(),
+                                       self.version - 1, self.version)
+        return True
+
+    def count_words(self, words):
+        """
+        Like count_words for the open files, but answers words searched before
+        from the search cache and only counts the others.
+        Returns {lowercased word: [filename, count] pairs}, in the order the words were given
+        """
+        filenames = self.filenames
+        found = {}
+        missing = []
+        for word in dict.fromkeys(word.lower() for word in words):
+            counts = self.search_cache.get(word, self.version)
+            if counts is None:
+                missing.append(word)
+                found[word] = None
+            else:
+                found[word] = [[name, counts[name]] for name in filenames]
+        if missing:
+            for word, totals in count_words(filenames, self.word_indexes(), missing).items():
+                self.search_cache.put(word, self.version, dict(totals))
+                found[word] = totals
+        return found
+
+    def positional_search(self, words, distance=None, max_locations=10):
+        """
+        Finds a phrase (distance None) or the first of two words with the second at most
+        distance words away (see parse_positional_query), in every open file.
+        Returns a list of [filename, occurrences, packed locations of the first
+        max_locations] like count_word's list
+        """
+        started = STATS.start()
+        word_ids = [self.vocab.get(word.lower()) for word in words]
+        results = []
+        for file_num, corpus_file in enumerate(self._files.values(), start=1):
+            if None in word_ids:
+                positions = array('I') # A word no file has ever had
+            else:
+                index = corpus_file.positional_index(self.vocab)
+                if distance is None:
+                    positions = index.phrase(word_ids)
+                else:
+                    positions = index.near(word_ids[0], word_ids[1], distance)
+            results.append([corpus_file.name, len(positions),
+                            corpus_file.locations(file_num, positions[:max_locations])])
+        STATS.stop(started, "positional_search")
+        return results
+
+    def word_list(self):
+        """ Returns the WordListIndex of the open files, for wildcard searches """
+        if self._word_list is None:
+            # For letters and hyphens concordance order is plain string order,
+            # so WordListIndex only has to check that the words are sorted
+            self._word_list = WordListIndex(self.sorted_words.words())
+        return self._word_list
+
+    def expand_search(self, words):
+        """
+        Replaces each pattern in a list of legal words and patterns by the words
+        it matches. Returns (words to count, {pattern: matched words})
+        """
+        expanded = []
+        matches = {}
+        for word in words:
+            if is_pattern(word):
+                matches[word] = self.word_list().expand(word)
+                expanded += matches[word]
+            else:
+                expanded.append(word)
+        return expanded, matches
+
+    def words_arrays(self):
+        return [f.words for f in self._files.values()]
+
+    def word_indexes(self):
+        return [f.word_index for f in self._files.values()]
+
+    def print_file_table(self):
+        """ print_file_table for the open files, from the counts kept since they were opened """
+        files = list(self._files.values())
+        totals = (self.stats.total_words, self.stats.distinct_spellings) if len(files) > 1 else None
+        print_file_table([f.name for f in files], [f.words for f in files],
+                         [f.distinct_words for f in files], totals)
+
+# Hash of a file's contents, used to tell if a cached parse is still good
+def file_digest(filename, chunk_size=READ_CHUNK_SIZE):
+    import hashlib # Imported when the cache is first used, it is slow to load
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class _HashingReader(io.RawIOBase):
+    """
+    Reads a binary file and adds every byte read to digest (a hashlib object),
+    so a file can be parsed and hashed in the same read.
+    """
+    def __init__(self, f, digest):
+        self._f = f
+        self.digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self._f.readinto(buffer)
+        self.digest.update(memoryview(buffer)[:count])
+        return count
+
+    def tell(self):
+        return self._f.tell()
+
+class ParseCache:
+    """
+    Keeps the parsed words and line numbers of files on disk between runs.
+    Each entry stores the file's size, mtime and content hash. An entry is used
+    as-is when size and mtime still match; otherwise the file is hashed and the
+    entry is only used if the contents are unchanged.
+    Entries are touched when used, and the least recently used ones are removed
+    once the cache is bigger than max_bytes (down to CACHE_EVICT_TO of it).
+    The size of the cache is found by looking at the directory once, then kept
+    up to date as entries are written, so the entries are only gone through
+    again when it is too big.
+    Problems reading or writing the cache are ignored, the file is just parsed again.
+    """
+    VERSION = 2
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._total_bytes = None # Size of all the entries, None until the directory is looked at
+
+    def _entry_path(self, filename):
+        import hashlib
+        key = hashlib.sha256(os.path.abspath(filename).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".pickle")
+
+    def load(self, filename):
+        """
+        Returns (words, word_ids, lines) saved for filename, or None if there is
+        no entry or the file has changed. word_ids index into words.
+        """
+        path = self._entry_path(filename)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            if entry["version"] != self.VERSION:
+                return None
+            st = os.stat(filename)
+            if (st.st_size, st.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+                # Touched or edited, only a different hash means it really changed
+                if st.st_size != entry["size"] or file_digest(filename) != entry["hash"]:
+                    return None
+                entry["mtime_ns"] = st.st_mtime_ns
+                self._write(path, entry)
+            else:
+                os.utime(path) # Mark as recently used
+        except Exception:
+            return None
+        return entry["words"], entry["word_ids"], entry["lines"]
+
+    def store(self, filename, st, digest, words, word_ids, lines):
+        """
+        Saves the parse of filename. st is the os.stat of the file from before it was read
+        and digest the hash of the bytes that were parsed (so an edit made while the
+        file was being parsed never matches the entry).
+        """
+        entry = {
+            "version": self.VERSION,
+            "path": os.path.abspath(filename),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "words": words,
+            "word_ids": word_ids,
+            "lines": lines,
+            "hash": digest,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self._entry_path(filename), entry)
+            if self.total_bytes() > self.max_bytes:
+                self.evict()
+        except Exception:
+            pass
+
+    def _write(self, path, entry):
+        # Write to a temp file first so a half written entry is never loaded
+        import tempfile
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        if self._total_bytes is not None:
+            self._total_bytes += size - old_size
+
+    def total_bytes(self):
+        """ Returns the size of all the entries in the cache """
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        return self._total_bytes
+
+    # (mtime, size, path) of every entry in the directory
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pickle"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self):
+        """
+        Removes least recently used entries until the cache is down to
+        CACHE_EVICT_TO of max_bytes.
+        """
+        # Look at the directory again, in case another run changed it
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes * CACHE_EVICT_TO:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+# Reads and parses files on a worker thread so the GUI doesn't freeze on big files
+class FileIngest:
+    """
+    Opens a list of files in the background, one after the other.
+    The GUI polls file_num / bytes_read / words_found for progress and checks done,
+    then takes results, a list of (filename, words, lines) with word ids from vocab,
+    once every file has been read. Files that couldn't be read are listed in failed
+    as (filename, error) instead.
+    If a ParseCache is given, unchanged files are loaded from it instead of parsed.
+    cancel() stops the worker; a cancelled ingest never returns any words.
+    start() runs it on a worker thread, run() runs it on the calling thread.
+    """
+    CHUNK_SIZE = READ_CHUNK_SIZE
+
+    def __init__(self, filenames, vocab, cache=None):
+        self.filenames = list(filenames)
+        self.vocab = vocab
+        self.cache = cache
+        self.total_bytes = sum(os.path.getsize(name) for name in self.filenames)
+        self.file_num = 0
+        self.filename = None
+        self.bytes_read = 0
+        self.words_found = 0
+        self.results = None
+        self.failed = []
+        self.cached_count = 0
+        self.file_stats = {} # filename -> (size, mtime_ns) from before it was read
+        self.done = False
+        self._bytes_before = 0 # Size of the files already read
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        results = []
+        for file_num, filename in enumerate(self.filenames, start=1):
+            if self.cancelled():
+                break
+            self.file_num = file_num
+            self.filename = filename
+            try:
+                st = os.stat(filename)
+                self.file_stats[filename] = (st.st_size, st.st_mtime_ns)
+                started = STATS.start()
+                parsed = self.cache.load(filename) if self.cache is not None else None
+                if parsed is not None:
+                    STATS.stop(started, "load from cache", len(parsed[1]), os.path.getsize(filename))
+                    self.cached_count += 1
+                else:
+                    parsed = self._parse(filename)
+                if parsed is not None and not self.cancelled():
+                    # Words are parsed with their own vocabulary, then given the shared ids
+                    local_words, local_ids, lines = parsed
+                    words = self.vocab.import_ids(local_words, local_ids)
+                    results.append((filename, words, lines))
+                    self.words_found += len(words)
+            except Exception as e:
+                self.failed.append((filename, e))
+            self._bytes_before += os.path.getsize(filename) if os.path.exists(filename) else 0
+            self.bytes_read = self._bytes_before
+        if not self.cancelled():
+            self.results = results
+        self.done = True
+
+    # Streams one file, returns (words, word_ids, lines) or None if cancelled
+    def _parse(self, filename):
+        local_vocab = Vocabulary()
+        word_ids = array('I')
+        lines = array('I')
+        words_before = self.words_found
+        st = os.stat(filename)
+        with open(filename, "rb") as f:
+            reader = f
+            if self.cache is not None:
+                # Hash the same bytes that are parsed, instead of reading the file again
+                import hashlib
+                reader = io.BufferedReader(_HashingReader(f, hashlib.sha256()))
+            for new_words, new_lines in iter_word_chunks(reader, self.CHUNK_SIZE):
+                if self.cancelled():
+                    return None
+                word_ids.extend(local_vocab.encode(new_words))
+                lines.extend(new_lines)
+                self.bytes_read = self._bytes_before + f.tell()
+                self.words_found = words_before + len(word_ids)
+        self.words_found = words_before
+        if self.cache is not None:
+            self.cache.store(filename, st, reader.raw.digest.hexdigest(), local_vocab.words, word_ids, lines)
+        return local_vocab.words, word_ids, lines
+
+class FilePatch:
+    """
+    A change to one open file found by FileWatcher. The words of lines start to
+    old_stop (0-based, old_stop None means to the end of the file) are replaced by
+    words, which start on the line numbers in lines, and the lines after them
+    move by line_delta.
+    """
+    def __init__(self, name, start, old_stop, line_delta, words, lines):
+        self.name = name
+        self.start = start
+        self.old_stop = old_stop
+        self.line_delta = line_delta
+        self.words = words
+        self.lines = lines
+
+class _WatchedFile:
+    """ What FileWatcher knows about the last version of a file it read """
+    def __init__(self, name, size, mtime_ns):
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.line_crcs = None # CRC-32 of each line, once the file has been read
+        self.hyphen_lines = None # Lines that end in "-" (and may join the next line)
+        self.failed = False # An error was reported, and the file hasn't been read since
+
+class FileWatcher:
+    """
+    Keeps the open files up to date when they change on disk.
+    A background thread checks the size and mtime of every watched file each interval
+    seconds. When they change, the file is read again a block at a time and the CRC-32
+    of each line is compared with the last version, so only the lines between the
+    unchanged start and end of the file are kept and split into words again. Appending
+    to a file only re-parses the new lines, and memory use doesn't grow with the size
+    of the file.
+    Changes wait as FilePatch objects until take_patches() is called (by the GUI
+    thread), which then gives them to Corpus.apply_patch. Files that couldn't be read
+    are listed in errors as (filename, error), once until they can be read again.
+    """
+    def __init__(self, interval=WATCH_INTERVAL):
+        self.interval = interval
+        self.errors = []
+        self._files = {} # name -> _WatchedFile
+        self._patches = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def watch(self, name, size, mtime_ns):
+        """
+        Starts watching a file that was just opened. size and mtime_ns are from
+        before it was read, so a change made while it was being read is caught too.
+        """
+        with self._lock:
+            self._files[name] = _WatchedFile(name, size, mtime_ns)
+
+    def unwatch(self, name):
+        with self._lock:
+            self._files.pop(name, None)
+            self._patches = [patch for patch in self._patches if patch.name != name]
+
+    def take_patches(self):
+        """ Returns the changes found since the last call """
+        with self._lock:
+            patches, self._patches = self._patches, []
+        return patches
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """ Looks at every watched file once """
+        with self._lock:
+            watched_files = list(self._files.values())
+        for watched in watched_files:
+            try:
+                patch = self._check_file(watched)
+            except (OSError, UnicodeDecodeError) as e:
+                if not watched.failed:
+                    watched.failed = True
+                    self.errors.append((watched.name, e))
+                continue
+            watched.failed = False
+            if patch is not None:
+                with self._lock:
+                    if self._files.get(watched.name) is watched:
+                        self._patches.append(patch)
+
+    def _check_file(self, watched):
+        st = os.stat(watched.name)
+        stat = (st.st_size, st.st_mtime_ns)
+        if watched.line_crcs is not None and stat == (watched.size, watched.mtime_ns):
+            return None
+        line_crcs = array('I')
+        hyphen_lines = []
+        block_lines = array('Q') # First line of each block read, and where it starts in the file
+        block_offsets = array('Q')
+        with open(watched.name, "rb") as f:
+            for offset, lines in _iter_line_blocks(f):
+                first = len(line_crcs)
+                block_lines.append(first)
+                block_offsets.append(offset)
+                line_crcs.extend(map(zlib.crc32, lines))
+                hyphen_lines += [i for i, line in enumerate(lines, first) if line[-1:] == b"-"]
+            line_count = len(line_crcs)
+
+            if watched.line_crcs is None:
+                # First look at the file: only re-parse it if it changed after it was opened
+                changed = stat != (watched.size, watched.mtime_ns)
+                start, old_stop, new_stop = 0, None, line_count
+            else:
+                old_crcs = watched.line_crcs
+                start = _common_prefix(old_crcs, line_crcs)
+                same_end = _common_suffix(old_crcs, line_crcs, min(len(old_crcs), line_count) - start)
+                old_stop = len(old_crcs) - same_end
+                new_stop = line_count - same_end
+                changed = not start == old_stop == new_stop # Or only touched
+                if changed:
+                    # A hyphenated line break joins a line to the next, so take those in too
+                    old_hyphens = set(watched.hyphen_lines)
+                    new_hyphens = set(hyphen_lines)
+                    while start > 0 and start - 1 in new_hyphens:
+                        start -= 1
+                    while new_stop < line_count and (new_stop - 1 in new_hyphens or old_stop - 1 in old_hyphens):
+                        new_stop += 1
+                        old_stop += 1
+            patch = None
+            if changed:
+                lines = self._read_lines(f, block_lines, block_offsets, start, new_stop)
+                if array('I', map(zlib.crc32, lines)) != line_crcs[start:new_stop]:
+                    return None # Changed again while being read, look at it next time
+                patch = self._make_patch(watched.name, lines, start, old_stop, new_stop)
+        watched.size, watched.mtime_ns = stat
+        watched.line_crcs = line_crcs
+        watched.hyphen_lines = hyphen_lines
+        return patch
+
+    # Reads lines start to stop again, from the block they start in
+    @staticmethod
+    def _read_lines(f, block_lines, block_offsets, start, stop):
+        block = max(bisect.bisect_right(block_lines, start) - 1, 0)
+        f.seek(block_offsets[block])
+        line_num = block_lines[block]
+        found = []
+        for _, lines in _iter_line_blocks(f):
+            found += lines[max(start - line_num, 0):max(stop - line_num, 0)]
+            line_num += len(lines)
+            if line_num >= stop:
+                break
+        return found
+
+    @staticmethod
+    def _make_patch(name, lines, start, old_stop, new_stop):
+        """ lines are the lines start to new_stop of the file """
+        text = b"\n".join(lines).decode("utf-8")
+        words, line_nums = extract_word_positions(text, start + 1)
+        line_delta = 0 if old_stop is None else new_stop - old_stop
+        return FilePatch(name, start, old_stop, line_delta, words, line_nums)
+
+# Reads a binary file a block at a time and splits it into lines like text mode
+# does (\r\n and \r end a line too). Yields (offset, lines) for each block, offset
+# being where its first line starts in the file; the last block has the text after
+# the last line ending (which may be empty) as its last line
+def _iter_line_blocks(f, chunk_size=READ_CHUNK_SIZE):
+    offset = f.tell()
+    pending = b""
+    while True:
+        raw = f.read(chunk_size)
+        data = pending + raw
+        if not raw:
+            yield offset, _split_lines(data)
+            return
+        # A \r at the end may be the start of a \r\n, keep it for the next block
+        end = len(data) - 1 if data.endswith(b"\r") else len(data)
+        cut = max(data.rfind(b"\n", 0, end), data.rfind(b"\r", 0, end)) + 1
+        if cut:
+            lines = _split_lines(data[:cut])
+            lines.pop() # The empty text after the last line ending
+            yield offset, lines
+            offset += cut
+        pending = data[cut:]
+
+def _split_lines(data):
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return data.split(b"\n")
+
+# Length of the longest common start of two arrays (found by comparing slices)
+def _common_prefix(a, b):
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+# Length of the longest common end of two arrays, at most limit
+def _common_suffix(a, b, limit):
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
@@ -0,0 +1,955 @@
+"""
+The Tk GUI of SG3. Only imported by sg3.main(), so the text processing in
+sg3_core (and importing sg3) never loads Tk.
+"""
+import sys
+import tkinter as tk
+from tkinter import messagebox
+from tkinter import ttk
+from tkinter import filedialog
+import os
+# The text processing lives in sg3_core so it can be used without Tk
+from sg3_core import *
+
+# The new sg3 implementations done so far. I adding multiple lines so it is obvious where it was placed.
+#***********************************************************
+# Here is where I put Elena's code. It seem that this code acts as the
+# main and so I deleted the previous sg2 main function. -Hannah
+MAIN_FONT = "Arial"
+MAIN_STYLE = {
+    'font': "Arial", 
+}   
+
+# Listbox with a scrollbar, one widget however many files are open
+def file_listbox(parent, names, height=10):
+    """ Returns (frame, listbox) holding the names """
+    frame = tk.Frame(parent)
+    scrollbar = tk.Scrollbar(frame, orient="vertical")
+    listbox = tk.Listbox(frame, height=min(height, max(1, len(names))),
+                         exportselection=False, yscrollcommand=scrollbar.set)
+    scrollbar.config(command=listbox.yview)
+    if names:
+        listbox.insert(tk.END, *names)
+    listbox.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+    return frame, listbox
+
+class OpenFileUI(tk.Frame):
+    def __init__(self,parent,on_submit,on_cancel=None):
+        tk.Frame.__init__(self,parent)
+        """
+        Initialize Widget
+        """
+#Addition to get user to input the text manually from the directory
+        self._on_submit = on_submit
+        self._on_cancel = on_cancel
+        label = tk.Label(self, text="Enter a .TXT filename, a folder, or a pattern like books/*.txt:",
+                         font=(MAIN_FONT, 10))
+        label.pack(anchor="w", padx=5, pady=5)
+
+        self._entry = tk.Entry(self, width=40)
+        self._entry.pack(anchor="w", padx=5, pady=5)
+
+        self._submit_btn = tk.Button(
+            self,
+            text="Open File",
+            command=self._handle_submit
+        )
+        self._submit_btn.pack(anchor="w", padx=5, pady=5)
+
+        # Cancel is only enabled while a file is being read
+        self._cancel_btn = tk.Button(
+            self,
+            text="Cancel",
+            command=self._handle_cancel,
+            state="disabled"
+        )
+        self._cancel_btn.pack(anchor="w", padx=5, pady=5)
+
+        self._progress_label = tk.Label(self, text="", font=(MAIN_FONT, 9))
+        self._progress_label.pack(anchor="w", padx=5, pady=5)
+
+        self._msg_label = tk.Label(self, text="", fg="blue",
+                                   font=(MAIN_FONT, 9))
+        self._msg_label.pack(anchor="w", padx=5, pady=5)
+
+    def _handle_submit(self):
+        filename = self._entry.get().strip()
+        if self._on_submit:
+            self._on_submit(self, filename)
+
+    def _handle_cancel(self):
+        if self._on_cancel:
+            self._on_cancel(self)
+
+    def set_busy(self, busy):
+        """ Switches between the Open File and Cancel buttons while a file is being read """
+        self._submit_btn.config(state="disabled" if busy else "normal")
+        self._cancel_btn.config(state="normal" if busy else "disabled")
+        if not busy:
+            self._progress_label.config(text="")
+
+    def show_progress(self, text):
+        self._progress_label.config(text=text)
+
+    def show_message(self, text, is_error=False):
+        self._msg_label.config(text=text, fg="red" if is_error else "blue")
+
+# Edited this class so that the file will close one of the files as per request of the user.   
+class CloseFileUI(tk.Frame):
+    program = 4
+    def __init__(self,parent,files,on_submit):
+        """
+        Initialize Widget
+        """
+        tk.Frame.__init__(self,parent)
+        self._files = files
+        self._on_submit = on_submit
+
+        if len(self._files)>0:
+            lbl = tk.Label(self, text="Select a file to close:",
+                           font=(MAIN_FONT, 10))
+            lbl.pack(anchor="w", padx=5, pady=5)
+
+            list_frame, self._listbox = file_listbox(self, self._files)
+            list_frame.pack(fill="x", padx=5, pady=5)
+
+            close_btn = tk.Button(
+                self,
+                text="Close Selected File",
+                command=self._handle_close
+            )
+            close_btn.pack(anchor="w", padx=5, pady=5)
+        else:
+            messagebox.showerror("Error, you must have open files to use this option.")
+
+    def _handle_close(self):
+        if not self._files:
+            return
+        sel = self._listbox.curselection()
+        if not sel:
+            messagebox.showerror("Error", "Please select a file to close.")
+            return
+        index = sel[0]
+        filename = self._files[index]
+        if self._on_submit:
+            self._on_submit(filename)
+
+    def getProgramId(self):
+        """ Returns Id of Program"""
+        return self.program
+
+# Edited to add a textbox for the user to manually input the files
+class WordSearchUI(tk.Frame):
+    """ Ui for word search, """
+    program = 2
+    """  """
+    def __init__(self,parent,files,on_submit,on_cancel,on_error):
+        """
+        Initialize Widget
+        """
+        tk.Frame.__init__(self,parent)
+        self._files = files
+        self._on_submit = on_submit
+        self._on_cancel = on_cancel
+        self._on_error = on_error
+
+        if len(self._files) > 0:
+            self._search_panel = ttk.LabelFrame(self, text="Word Search")
+            self._search_panel.pack(anchor="nw", fill="x", padx=5, pady=5)
+
+            tk.Label(self._search_panel, text="Enter one or more legal words "
+                      "(letters and optional hyphens),\nseparated by commas or new lines. "
+                      "Use * or ? as wildcards, like inter* or *-based.\n"
+                      "Search a phrase like white whale, or words near each other\n"
+                      "like whale ~5 sea (at most 5 words apart):",
+                      justify="left").grid(
+                row=0, column=0, columnspan=3, sticky="w", pady=2
+            )
+
+            self._input = tk.Text(self._search_panel, width=40, height=4)
+            self._input.grid(row=1, column=0, columnspan=3, sticky="w")
+
+            self._submit_btn = tk.Button(
+                self._search_panel,
+                text="Search",
+                command=lambda: self._on_submit(self)
+            )
+            self._submit_btn.grid(row=2, column=0, sticky="w", pady=5)
+
+            self._cancel_btn = tk.Button(
+                self._search_panel,
+                text="Cancel",
+                command=self._on_cancel
+            )
+            self._cancel_btn.grid(row=2, column=1, sticky="w", pady=5)
+
+            self._result_panel = ttk.LabelFrame(self, text="Results")
+            self._result_panel.pack(anchor="nw", fill="both",
+                                    expand=True, padx=5, pady=5)
+
+            self._results = tk.Text(self._result_panel, width=60, height=15)
+            self._results.pack(fill="both", expand=True, padx=5, pady=5)
+        else:
+            messagebox.showerror("Error, you must have open files to use this option.")
+            if self._on_error:
+                self._on_error(self.program)
+
+    def get_word(self):
+        word = self._input.get("1.0", tk.END).strip()
+        return word
+
+    def show_results(self, text):
+        self._results.delete("1.0", tk.END)
+        self._results.insert(tk.END, text + "\n")
+
+    def getProgramId(self):
+        return self.program
+
+# Edited to let the user see a list of the files and fix the bug of the 
+# open_files being passed into _init_ which would make the list empty
+# And send the appropriate errors for the user
+class SelectOpenFile(tk.Frame):
+    """
+        Gui that shows the user a list of opened files to choose from
+    """
+    def __init__(self,parent, open_files=[], on_submit=None):
+        """
+        Initialize Widget
+        """
+        tk.Frame.__init__(self,parent)
+        self._open_files = []
+        if len(self._open_files > 0):
+            open_files = []
+        self._open_files = open_files
+        self._on_submit = on_submit
+
+        if len(self._open_files) > 0:
+            lbl = tk.Label(self, text="Select an open file:",
+                           font=(MAIN_FONT, 10))
+            lbl.pack(anchor="w", padx=5, pady=5)
+
+            self._listbox = tk.Listbox(self, height=min(10, len(open_files)))
+            for fname in self._open_files:
+                self._listbox.insert(tk.END, fname)
+            self._listbox.pack(fill="x", padx=5, pady=5)
+
+            submit_btn = tk.Button(
+                self,
+                text="OK",
+                command=self._handle_submit
+            )
+            submit_btn.pack(anchor="w", padx=5, pady=5)
+        else:
+            messagebox.showerror("Error", "No open files available.")
+
+    def _handle_submit(self):
+        if not self._open_files or not self._on_submit:
+            return
+        sel = self._listbox.curselection()
+        if not sel:
+            messagebox.showerror("Error", "Please select a file.")
+            return
+        index = sel[0]
+        self._on_submit(self._open_files[index])
+
+# Edit this class so that is can align more with the previous sg2 that
+# we are using as the base. I also makes it more convienient for the
+# User to see all the files and to build the option of build cordanance. 
+class BuildConcordance(tk.Frame):
+    """
+        Gui Frame that 
+    """
+    def __init__(self,parent, open_files=[], on_submit=None, on_submit_all=None):
+        """
+        Initialize Widget
+        """
+        tk.Frame.__init__(self,parent)
+        if open_files is None:
+            open_files = []
+        self._open_files = open_files
+        self._on_submit = on_submit
+        self._on_submit_all = on_submit_all
+
+        if len(self._open_files) > 0:
+            lbl = tk.Label(self, text="Select a file to build a concordance:",
+                           font=(MAIN_FONT, 10))
+            lbl.pack(anchor="w", padx=5, pady=5)
+
+            list_frame, self._listbox = file_listbox(self, self._open_files)
+            list_frame.pack(fill="x", padx=10)
+            self._listbox.selection_set(0)
+
+            build_btn = tk.Button(
+                self,
+                text="Build Concordance",
+                command=self._handle_submit
+            )
+            build_btn.pack(anchor="w", padx=5, pady=10)
+
+            if self._on_submit_all and len(self._open_files) > 1:
+                build_all_btn = tk.Button(
+                    self,
+                    text="Build Concordance for All Open Files",
+                    command=self._on_submit_all
+                )
+                build_all_btn.pack(anchor="w", padx=5, pady=(0, 10))
+        else:
+            messagebox.showerror("Error, you must have open files to use this option.")
+
+    def _handle_submit(self):
+        if not self._open_files:
+            return
+        sel = self._listbox.curselection()
+        idx = sel[0] if sel else -1
+        if idx < 0 or idx >= len(self._open_files):
+            messagebox.showerror("Error", "Invalid file selection.")
+            return
+        if self._on_submit:
+            self._on_submit(self._open_files[idx])
+
+# Shows a concordance a screenful at a time, so it opens instantly however big it is
+class ConcordanceViewer(tk.Frame):
+    """
+    The Treeview only ever holds PAGE_ROWS rows. Scrolling (scrollbar, mouse wheel,
+    arrow and page keys) moves the first shown entry and refills the rows from a
+    ConcordanceView.
+    """
+    PAGE_ROWS = 20
+    def __init__(self, parent, view, title=""):
+        """
+        Initialize Widget
+        """
+        tk.Frame.__init__(self, parent)
+        self._view = view
+        self._first = 0
+
+        top = tk.Frame(self)
+        top.pack(fill="x", padx=5, pady=5)
+        tk.Label(top, text="Jump to word:").pack(side="left")
+        self._jump_entry = tk.Entry(top, width=20)
+        self._jump_entry.pack(side="left", padx=5)
+        self._jump_entry.bind("<Return>", lambda event: self._handle_jump())
+        tk.Button(top, text="Go", command=self._handle_jump).pack(side="left")
+
+        self._position = tk.Label(self, text="", anchor="w", font=(MAIN_FONT, 9))
+        self._position.pack(fill="x", padx=5)
+
+        table = tk.Frame(self)
+        table.pack(fill="both", expand=True, padx=5, pady=5)
+        self._tree = ttk.Treeview(table, columns=("word", "count", "locations"), show="headings",
+                                  height=self.PAGE_ROWS, selectmode="browse")
+        self._tree.heading("word", text="Word")
+        self._tree.heading("count", text="Count")
+        self._tree.heading("locations", text="Locations (file.line.word)")
+        self._tree.column("word", width=110, stretch=False)
+        self._tree.column("count", width=50, anchor="e", stretch=False)
+        self._tree.column("locations", width=260)
+        self._scrollbar = ttk.Scrollbar(table, orient="vertical", command=self._handle_scroll)
+        self._tree.pack(side="left", fill="both", expand=True)
+        self._scrollbar.pack(side="right", fill="y")
+
+        for widget in (self._tree, self._scrollbar):
+            widget.bind("<MouseWheel>", self._handle_wheel)
+            widget.bind("<Button-4>", lambda event: self.show(self._first - 3))
+            widget.bind("<Button-5>", lambda event: self.show(self._first + 3))
+        self._tree.bind("<Up>", lambda event: self._handle_key(-1))
+        self._tree.bind("<Down>", lambda event: self._handle_key(1))
+        self._tree.bind("<Prior>", lambda event: self._handle_key(-self.PAGE_ROWS))
+        self._tree.bind("<Next>", lambda event: self._handle_key(self.PAGE_ROWS))
+
+        if title:
+            print(f"Showing the concordance of {title} ({len(view)} words)")
+        self.show(0)
+
+    def show(self, first, selected=None):
+        """ Shows the entries starting at first, selecting entry number selected """
+        total = len(self._view)
+        self._first = max(0, min(first, total - self.PAGE_ROWS))
+        last = min(total, self._first + self.PAGE_ROWS)
+        self._tree.delete(*self._tree.get_children())
+        for index, row in enumerate(self._view.rows(self._first, last), start=self._first):
+            self._tree.insert("", tk.END, iid=str(index), values=row)
+        if selected is not None and self._first <= selected < last:
+            self._tree.selection_set(str(selected))
+            self._tree.focus(str(selected))
+        if total:
+            self._scrollbar.set(self._first / total, last / total)
+            self._position.config(text=f"Words {self._first + 1}-{last} of {total}")
+        else:
+            self._scrollbar.set(0, 1)
+            self._position.config(text="The concordance is empty.")
+        return "break"
+
+    def _handle_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.show(int(float(amount) * len(self._view)))
+        elif unit == "pages":
+            self.show(self._first + int(amount) * self.PAGE_ROWS)
+        else:
+            self.show(self._first + int(amount))
+
+    def _handle_wheel(self, event):
+        return self.show(self._first - (3 if event.delta > 0 else -3))
+
+    # Moves the selection, scrolling when it leaves the rows shown
+    def _handle_key(self, step):
+        focus = self._tree.focus()
+        selected = int(focus) + step if focus else self._first
+        selected = max(0, min(selected, len(self._view) - 1))
+        first = self._first
+        if selected < first:
+            first = selected
+        elif selected >= first + self.PAGE_ROWS:
+            first = selected - self.PAGE_ROWS + 1
+        return self.show(first, selected)
+
+    def _handle_jump(self):
+        word = self._jump_entry.get().strip()
+        if word and len(self._view):
+            index = self._view.find(word)
+            self.show(index, index)
+
+# Shows the timings and counters collected in STATS (see sg3_core.Stats)
+class StatsUI(tk.Frame):
+    """ Ui for the performance statistics (and the totals of the open files in corpus) """
+    program = 6
+    def __init__(self,parent, corpus=None):
+        """
+        Initialize Widget
+        """
+        tk.Frame.__init__(self,parent)
+        self._corpus = corpus
+        self._enabled = tk.BooleanVar(value=STATS.enabled)
+        tk.Checkbutton(self, text="Collect statistics", variable=self._enabled,
+                       command=self._handle_toggle).pack(anchor="w", padx=5, pady=5)
+
+        buttons = tk.Frame(self)
+        buttons.pack(anchor="w", padx=5)
+        tk.Button(buttons, text="Refresh", command=self.refresh).pack(side="left")
+        tk.Button(buttons, text="Reset", command=self._handle_reset).pack(side="left", padx=5)
+        tk.Button(buttons, text="Save as JSON...", command=self._handle_save).pack(side="left")
+
+        self._text = tk.Text(self, width=60, height=15, font=("Courier", 9))
+        self._text.pack(fill="both", expand=True, padx=5, pady=5)
+        self.refresh()
+
+    def refresh(self):
+        self._text.delete("1.0", tk.END)
+        if self._corpus is not None and len(self._corpus) > 0:
+            self._text.insert(tk.END, "\n".join(self._corpus.stats.summary_lines()) + "\n\n")
+        if STATS.snapshot():
+            self._text.insert(tk.END, "\n".join(STATS.table_lines()) + "\n")
+        elif STATS.enabled:
+            self._text.insert(tk.END, "Nothing has been timed yet.\n")
+        else:
+            self._text.insert(tk.END, "Statistics are off. Tick 'Collect statistics' to start.\n")
+
+    def _handle_toggle(self):
+        STATS.enabled = self._enabled.get()
+        self.refresh()
+
+    def _handle_reset(self):
+        STATS.reset()
+        self.refresh()
+
+    def _handle_save(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("JSON files", "*.json")])
+        if path:
+            STATS.dump(path)
+
+    def getProgramId(self):
+        return self.program
+# Self note of where the end of what I edited 12/03/2025 - hannah
+
+"""
+https://www.digitalocean.com/community/tutorials/tkinter-working-with-classes
+"""
+class MainMenu(tk.Frame):
+    """ Main Menu for Program """
+    _selected_option = None
+    """
+    
+    """
+    def __init__(self,parent,on_submit):
+        """
+        Initialize Widget
+        on submit
+        """
+        tk.Frame.__init__(self,parent)
+        
+        self._selected_option = tk.IntVar() # Selected option
+        
+        self._panel = ttk.LabelFrame(parent,text="Main Menu")
+        self._panel.pack(side="left",anchor='nw',fill="y")
+        # titleLbl = tk.Label(parent,text="Main Menu",font=(MAIN_FONT,20,"bold"))
+        # titleLbl.grid(row=0, column=0)
+        #options
+        
+        option1 = tk.Radiobutton(self._panel,text="1. Select a File",
+                                value=1,
+                                variable=self._selected_option,justify='left',takefocus=True)
+        option1.grid(row=1,column=0,columnspan=2,sticky='W')
+        option2 = tk.Radiobutton(self._panel,text="2. Find a word in all your open files",
+                                value=2, variable=self._selected_option,justify='left',takefocus=False)
+        option2.grid(row=2,column=0,columnspan=2,sticky='W')
+        option3 = tk.Radiobutton(self._panel,text="3. Build a concordance for one open file",
+                                value=3, variable=self._selected_option,justify='left',takefocus=False)
+        option3.grid(row=3,column=0,columnspan=2,sticky='W')
+        option4 =   tk.Radiobutton(self._panel,text="4. Close one of the files",
+                                value=4, variable=self._selected_option,justify='left',takefocus=False)
+        option4.grid(row=4,column=0,columnspan=2,sticky='W')
+        option5 = tk.Radiobutton(self._panel,text="5. Quit Program",
+                                value=5,variable=self._selected_option,justify='left',takefocus=False)
+        option5.grid(row=5,column=0,sticky='W')
+        option6 = tk.Radiobutton(self._panel,text="6. Performance statistics",
+                                value=6,variable=self._selected_option,justify='left',takefocus=False)
+        option6.grid(row=6,column=0,columnspan=2,sticky='W')
+        self.submit = tk.Button(self._panel,text="Enter",command=on_submit)
+        self.submit.grid(row=7,column=1)
+    # def on_selected(self):
+    def getSelectedOption(self):
+        return self._selected_option.get()
+    def clearOptions(self):
+        self._selected_option.set(0)
+    # def enable
+    
+class SG3:
+    '''
+    Runs the program
+    Note: I Created Certain Components as separate classes for the sake of organization.
+    
+    '''
+    TITLE = "SG3 Program"
+    SIZE = "700x600"
+    INGEST_POLL_MS = 100 # How often the GUI checks on a file being opened
+    WATCH_POLL_MS = 500 # How often the GUI applies the changes the file watcher found
+    introduction = ("Usage: This program accepts a '.txt.' file that must reside within the same directory as this program.\n"
+      "After the file is successfully uploaded. The words within the file will be parsed and counted.\n"
+      "Afterwards you will be prompted to enter a word, this will check the occurrences of that word and display a count.\n"
+      "You will then be prompted to continue entering words until you are complete.\n"
+      "Once completed the list of words and their counts will be listed.")
+   
+    def __init__(self, max_files=max_input_files, echo="all"):
+        # Edited to keep track of open files (their words, lines and indexes) and word searches
+        self._corpus = Corpus(max_files)
+        self._echo = echo # How much of the output files is printed (see write_lines)
+        self._word_search_array = []
+        self._ingest = None # FileIngest currently running, if any
+        self._ingest_ui = None
+        self._parse_cache = ParseCache()
+        self._watcher = FileWatcher() # Re-reads the changed lines of open files that change on disk
+        self._watcher.start()
+        self._program = 0
+        self.root = tk.Tk()
+        self.root.geometry(self.SIZE)
+        self.root.title(self.TITLE)
+
+        self._main_menu =  MainMenu(self.root,on_submit=self.menu_option_selected)
+        self._main_menu.pack(fill="x",side='right',anchor='nw')
+
+        self.sub_panel = ttk.LabelFrame(self.root,text="Program",width=450)
+        self.sub_panel.pack(side='right',anchor="ne",fill="both")
+        self.sub_window = None
+
+        self.root.after(self.WATCH_POLL_MS, self._poll_watcher)
+        self.root.mainloop()
+
+    
+    def menu_option_selected(self):
+        print("Menu Option Selected")
+        self._program = self._main_menu.getSelectedOption()
+        # Edited to add this to clear the previous subwindows
+        if self.sub_window is not None:
+            self.sub_window.destroy()
+            self.sub_window = None
+
+        match self._program:
+            case 1:
+                self.open_files_ui()
+            case 2:
+                self.word_search_ui()
+            case 3:
+                self.concordance_window()
+            case 4:
+                self.close_file_ui()
+            case 5:
+                self.exit_program()
+            case 6:
+                self.stats_ui()
+            case _:
+                pass
+    def on_error(self,program):
+        # Edited this to properly send error fot sub_window is none
+        if program != 0 and self.sub_window is not None:
+            self.sub_window.destroy()
+        self._program = 0
+
+# Editing this because some of the functions were moved about and
+# this function is used to implement GUI open file handler        
+    def open_files_ui(self): # for opening files
+        self.sub_panel.config(text="Open File")
+        if self._corpus.room() == 0:
+            messagebox.showerror(
+                "Error",
+                f"You already have the maximum of {self._corpus.max_files} files open."
+            )
+            return
+        self.sub_window = OpenFileUI(self.sub_panel, on_submit=self._handle_open_file,
+                                     on_cancel=self._cancel_open_file)
+        if self._ingest is not None:
+            # A file is still being read, let this window show its progress
+            self._ingest_ui = self.sub_window
+            self.sub_window.set_busy(True)
+        self.sub_window.pack(fill="both", expand=True, padx=5, pady=5)
+    # To handle the opened files selected by the user
+    def _handle_open_file(self, ui: OpenFileUI, filename: str):
+        if not filename:
+            ui.show_message("ERROR: Please enter a filename.", is_error=True)
+            return
+        if self._ingest is not None:
+            ui.show_message("ERROR: Another file is still being opened.", is_error=True)
+            return
+
+        filenames = expand_file_pattern(filename)
+        if filenames == [filename]:
+            # A single file, check it the same way as always
+            if not txt_filename(filename):
+                ui.show_message("ERROR: Filename must end in .TXT.", is_error=True)
+                return
+            if not os.path.isfile(filename):
+                ui.show_message("ERROR: File does not exist in this directory.", is_error=True)
+                return
+            if filename in self._corpus:
+                ui.show_message("ERROR: File has already been opened.", is_error=True)
+                return
+        else:
+            # A folder or pattern, skip files that are already open
+            if not filenames:
+                ui.show_message("ERROR: No .TXT files match.", is_error=True)
+                return
+            filenames = [name for name in filenames if name not in self._corpus]
+            if not filenames:
+                ui.show_message("ERROR: All matching files have already been opened.", is_error=True)
+                return
+        if len(filenames) > self._corpus.room():
+            ui.show_message(f"ERROR: Cannot open more than {self._corpus.max_files} files "
+                            f"({len(filenames)} selected, {self._corpus.room()} more allowed).",
+                            is_error=True)
+            return
+
+        # Read and parse on a worker thread, progress is polled with root.after
+        try:
+            self._ingest = FileIngest(filenames, self._corpus.vocab, self._parse_cache)
+        except Exception as e:
+            ui.show_message(f"ERROR reading file: {e}", is_error=True)
+            return
+        self._ingest_ui = ui
+        ui.set_busy(True)
+        ui.show_message("")
+        self._ingest.start()
+        self.root.after(self.INGEST_POLL_MS, self._poll_open_file)
+
+    # Checks on the files being opened and adds them once they have all been parsed
+    def _poll_open_file(self):
+        ingest = self._ingest
+        if ingest is None:
+            return
+        ui = self._ingest_ui
+        if ui is not None and not ui.winfo_exists():
+            ui = self._ingest_ui = None
+
+        if not ingest.done:
+            if ui is not None:
+                file_count = len(ingest.filenames)
+                which = f" (file {ingest.file_num} of {file_count})" if file_count > 1 else ""
+                ui.show_progress(f"Reading '{ingest.filename}'{which}: "
+                                 f"{ingest.bytes_read:,} of {ingest.total_bytes:,} bytes, "
+                                 f"{ingest.words_found:,} words found")
+            self.root.after(self.INGEST_POLL_MS, self._poll_open_file)
+            return
+
+        self._ingest = None
+        self._ingest_ui = None
+        if ui is not None:
+            ui.set_busy(False)
+        if ingest.cancelled():
+            if ui is not None:
+                ui.show_message("Opening was cancelled, no files were opened.", is_error=True)
+            return
+
+        for filename, words, lines in ingest.results:
+            self._corpus.add(filename, words, lines)
+            self._watcher.watch(filename, *ingest.file_stats[filename])
+
+        if ui is not None:
+            if len(ingest.filenames) == 1 and ingest.results:
+                corpus_file = self._corpus.get(ingest.results[0][0])
+                source = " (loaded from cache)" if ingest.cached_count else ""
+                ui.show_message(f"File '{corpus_file.name}' opened successfully{source}. "
+                                f"Total words: {corpus_file.total_words}, "
+                                f"distinct: {corpus_file.distinct_words}.")
+            elif len(ingest.filenames) == 1:
+                ui.show_message(f"ERROR reading file: {ingest.failed[0][1]}", is_error=True)
+            else:
+                message = (f"Opened {len(ingest.results)} files "
+                           f"({ingest.cached_count} from cache), {ingest.words_found:,} words.")
+                if ingest.failed:
+                    filename, error = ingest.failed[0]
+                    message += f" Could not read {len(ingest.failed)} file(s), e.g. '{filename}': {error}"
+                ui.show_message(message, is_error=bool(ingest.failed))
+
+        if ingest.results:
+            self._corpus.print_file_table()
+
+    # Stops the files that are being opened, nothing from them is kept
+    def _cancel_open_file(self, ui: OpenFileUI):
+        if self._ingest is not None:
+            self._ingest.cancel()
+            ui.show_progress("Cancelling...")
+
+    # This function does the GUI word search
+    def word_search_ui(self):
+        self.sub_panel.config(text="Word Search")
+        if len(self._corpus) == 0:
+            messagebox.showerror("Error", "You must open at least one file first.")
+            return
+        self.sub_window = WordSearchUI(
+            self.sub_panel,
+            self._corpus.filenames,
+            on_submit=self._do_word_search,
+            on_cancel=self._cancel_subprogram,
+            on_error=self.on_error
+        )
+        self.sub_window.pack(fill="both", expand=True, padx=5, pady=5)
+    # Helps the code do the word search based on user gui input
+    def _do_word_search(self, ui: WordSearchUI):
+        words = split_word_list(ui.get_word())
+        if not words:
+            ui.show_results("Error: Please enter a word to search.")
+            return
+
+        # Every word is checked, the legal ones are still searched
+        message_lines = []
+        legal_words = []
+        phrases = []
+        for word in words:
+            if is_positional_query(word):
+                error = positional_query_error(word)
+            else:
+                error = legal_pattern_error(word) if is_pattern(word) else legal_word_error(word)
+            if error:
+                message_lines.append(f"Error in '{word}': {error}" if len(words) > 1 else f"Error: {error}")
+            elif is_positional_query(word):
+                phrases.append(word)
+            else:
+                legal_words.append(word)
+        if not legal_words and not phrases:
+            ui.show_results("\n".join(message_lines))
+            return
+
+        # Phrases and words near each other are found with the positional index
+        phrase_lines = []
+        for query in phrases:
+            query_words, distance = parse_positional_query(query)
+            results = self._corpus.positional_search(query_words, distance)
+            phrase_lines += positional_result_lines(" ".join(query.split()), results)
+
+        # Patterns are replaced by the words they match
+        word_lines = []
+        legal_words, matches = self._corpus.expand_search(legal_words)
+        for pattern, matched in matches.items():
+            message_lines.append(f"'{pattern}' matched {len(matched)} word(s).")
+        if legal_words:
+            filenames = self._corpus.filenames
+            results = self._corpus.count_words(legal_words)
+            for word_lc, totals in results.items():
+                self._word_search_array.append((word_lc, totals))
+
+            # Creating the GUI result text
+            if len(results) == 1 and not matches:
+                word_lc, totals = next(iter(results.items()))
+                word_lines = search_result_lines(word_lc, totals)
+            else:
+                counts = [[word_lc] + [count for _, count in totals] for word_lc, totals in results.items()]
+                word_lines = [f"Search results for {len(results)} words:"]
+                word_lines += word_table_lines(counts, filenames)
+
+        result_lines = []
+        for part in (message_lines, phrase_lines, word_lines):
+            if part:
+                result_lines += ([""] if result_lines else []) + part
+        ui.show_results("\n".join(result_lines))
+        print("\n".join(result_lines))
+
+    # Create the concordance of the user selected files from the GUi
+    def concordance_window(self):
+        self.sub_panel.config(text="Build Concordance")
+        if len(self._corpus) == 0:
+            messagebox.showerror("Error", "You must open at least one file first.")
+            return
+        self.sub_window = BuildConcordance(
+            self.sub_panel,
+            open_files=self._corpus.filenames,
+            on_submit=self._handle_build_concordance,
+            on_submit_all=self._handle_build_concordance_all
+        )
+        self.sub_window.pack(fill="both", expand=True, padx=5, pady=5)
+    # Only the selected files only can be used to build the concordance
+    def _handle_build_concordance(self, filename: str):
+        corpus_file = self._corpus.get(filename)
+        if corpus_file is None:
+            messagebox.showerror("Error", f"File '{filename}' is not currently open.")
+            return
+
+        # Use the words and line numbers captured when the file was opened
+        vocab = self._corpus.vocab
+        wordlists = [corpus_file.words]
+        concordance = build_concordance_from_positions(wordlists, [corpus_file.lines], vocab,
+                                                       order=self._corpus.sorted_words)
+        write_concordance(concordance, echo=self._echo)
+
+        filenames = [filename]
+        write_extra_lists(concordance, filenames, wordlists, vocab, echo=self._echo)
+
+        messagebox.showinfo(
+            "Concordance",
+            "Concordance written to CONCORDANCE.TXT\n"
+            "Extra lists written to ExtraLists.txt\n"
+            f"(Built using file: {filename})"
+        )
+
+        print("\nConcordance and Extra Lists built for:", filename)
+        self._show_concordance(concordance, filename)
+
+    # Concordance of every open file, each file is parsed in its own process
+    def _handle_build_concordance_all(self):
+        filenames = self._corpus.filenames
+        if not filenames:
+            messagebox.showerror("Error", "You must open at least one file first.")
+            return
+
+        try:
+            concordance = build_concordance(filenames, workers=None, order=self._corpus.sorted_words)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not build the concordance: {e}")
+            return
+        write_concordance(concordance, echo=self._echo)
+        write_extra_lists(concordance, filenames, self._corpus.words_arrays(), self._corpus.vocab,
+                          echo=self._echo)
+
+        messagebox.showinfo(
+            "Concordance",
+            "Concordance written to CONCORDANCE.TXT\n"
+            "Extra lists written to ExtraLists.txt\n"
+            f"(Built using all {len(filenames)} open files)"
+        )
+
+        print(f"\nConcordance and Extra Lists built for all {len(filenames)} open files")
+        self._show_concordance(concordance, f"all {len(filenames)} open files")
+
+    # Replaces the file selection with a viewer of the concordance just built
+    def _show_concordance(self, concordance, title):
+        if self.sub_window is not None:
+            self.sub_window.destroy()
+        self.sub_panel.config(text=f"Concordance of {title}")
+        self.sub_window = ConcordanceViewer(self.sub_panel, ConcordanceView(concordance), title)
+        self.sub_window.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # Close the file in the gui option 4
+    def close_file_ui(self):
+        self.sub_panel.config(text="Close a File")
+        if len(self._corpus) == 0:
+            messagebox.showerror("Error", "You must have open files to use this option.")
+            return
+        self.sub_window = CloseFileUI(
+            self.sub_panel,
+            files=self._corpus.filenames,
+            on_submit=self._handle_close_file
+        )
+        self.sub_window.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # Function to close the file and to remove it from the memory and list
+    def _handle_close_file(self, filename: str):
+        if filename not in self._corpus:
+            messagebox.showerror("Error", f"File '{filename}' is not currently open.")
+            return
+        self._corpus.remove(filename)
+        self._watcher.unwatch(filename)
+
+        messagebox.showinfo("Close File", f"Closed file '{filename}'.")
+        print(f"Closed file '{filename}'.")
+
+        if len(self._corpus) > 0:
+            self._corpus.print_file_table()
+        else:
+            print("No files currently open.")
+
+        if self.sub_window is not None:
+            self.sub_window.destroy()
+            self.sub_window = None
+
+    # Applies the changes to open files the watcher found on disk
+    def _poll_watcher(self):
+        changed = []
+        for patch in self._watcher.take_patches():
+            if self._corpus.apply_patch(patch):
+                changed.append(patch.name)
+                if patch.old_stop is None:
+                    print(f"'{patch.name}' changed on disk, read it again.")
+                else:
+                    print(f"'{patch.name}' changed on disk, read lines {patch.start + 1}-"
+                          f"{patch.old_stop + patch.line_delta} again.")
+        while self._watcher.errors:
+            filename, error = self._watcher.errors.pop(0)
+            print(f"ERROR: could not check '{filename}' for changes: {error}")
+        if changed:
+            self._corpus.print_file_table()
+        self.root.after(self.WATCH_POLL_MS, self._poll_watcher)
+
+    # Option 6 shows how long each stage took
+    def stats_ui(self):
+        self.sub_panel.config(text="Performance Statistics")
+        self.sub_window = StatsUI(self.sub_panel, self._corpus)
+        self.sub_window.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # Option 5 of exiting the program with summary statement
+    def exit_program(self):
+        if self._word_search_array and len(self._corpus) > 0:
+            queried_words_lc = get_queried_words_from(self._word_search_array)
+            print_summary_words(queried_words_lc, self._corpus.filenames,
+                                self._corpus.word_indexes(),
+                                found=self._corpus.count_words(queried_words_lc))
+
+        print(outro)
+        self._watcher.stop()
+        messagebox.showinfo("Exit", "Program has finished executing.")
+        self.root.destroy()
+        sys.exit(0)
+    
+    # To end the program 
+    def _cancel_subprogram(self):
+        if self.sub_window is not None:
+            self.sub_window.destroy()
+            self.sub_window = None
+        self.sub_panel.config(text="Program")
+
+    @staticmethod
+    def show_help(x):
+        ''' Displays a help box on screen '''
+        # messagebox.showinfo(title="SG3",message=SG3.introduction)
+    @staticmethod
+    def show(title,msg):
+        return messagebox.showinfo(title=title,message=msg)
+    
+    @staticmethod
+    def ask_continue(title,msg):
+        return messagebox.askyesno(title=title,message=msg)
+    @staticmethod
+    def error(title,msg):
+        return messagebox.showerror(title,msg)
+# Shows the introduction, then runs the GUI until the program is closed
+def run(max_files=max_input_files, echo="all"):
+    messagebox.showinfo(title="SG3",message=SG3.introduction)
+    main_program = SG3(max_files=max_files, echo=echo)
@@ -0,0 +1,373 @@
+"""
+Keeps parsed files in an SQLite database instead of in memory, so corpora much
+bigger than RAM can be opened and searched (used by sg3_batch.py --store).
+
+    store = SqliteStore("corpus.db")
+    corpus, failed = store.open_files(["a.txt", "b.txt"])
+    corpus.count_words(["whale"])
+    corpus.write_concordance("CONCORDANCE.TXT")
+
+Tables:
+    files(id, name, size, mtime_ns, total_words, distinct_words)
+    words(id, word, sort_key)                           lowercased words, sort_key is the collation key
+    counts(word_id, file_id, count)                     how often each word is in each file
+    positions(word_id, file_id, position, line, word_num)   every word of every file
+    spellings(file_id, spelling)                        the distinct spellings of each file
+
+Files are streamed into the database a chunk at a time and inserted in batches
+of STORE_BATCH_SIZE rows, with one transaction per file, so memory use doesn't
+grow with the size of the files. The database is kept between runs and files
+whose size and mtime haven't changed aren't read again.
+Searches, the summary, the concordance and the extra lists are SQL queries on
+the tables' primary keys and indexes, and their rows are streamed.
+"""
+import os
+import sqlite3
+from array import array
+from collections import Counter
+from sg3_core import (STATS, READ_CHUNK_SIZE, OUTPUT_BUFFER_SIZE, iter_word_chunks, collation_key,
+                      is_pattern, file_table_lines, write_lines, write_concordance,
+                      extra_lists_report_lines)
+
+STORE_BATCH_SIZE = 50000 # Rows inserted with each executemany
+STORE_CACHE_KB = 65536 # SQLite page cache, a bigger one makes inserting the positions quicker
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    total_words INTEGER NOT NULL,
+    distinct_words INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS words (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE,
+    sort_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS words_by_sort_key ON words (sort_key);
+CREATE TABLE IF NOT EXISTS counts (
+    word_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (word_id, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counts_by_file ON counts (file_id, word_id, count);
+CREATE TABLE IF NOT EXISTS positions (
+    word_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    word_num INTEGER NOT NULL,
+    PRIMARY KEY (word_id, file_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS spellings (
+    file_id INTEGER NOT NULL,
+    spelling TEXT NOT NULL,
+    PRIMARY KEY (file_id, spelling)
+) WITHOUT ROWID;
+"""
+
+class SqliteStore:
+    """
+    The database of parsed files. open_files() reads the files that are new or
+    changed into it and returns a StoreCorpus for searching them.
+    """
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, self.VERSION):
+            raise ValueError(f"{path} was made by another version of SG3 (store version {version})")
+        self._db.execute(f"PRAGMA cache_size = -{STORE_CACHE_KB}")
+        with self._db:
+            self._db.executescript(SCHEMA)
+            self._db.execute(f"PRAGMA user_version = {self.VERSION}")
+        self._word_ids = {} # Ids of the words looked up so far
+
+    def close(self):
+        self._db.close()
+
+    def open_files(self, filenames):
+        """
+        Makes sure every file is up to date in the database.
+        Returns (StoreCorpus of the files that could be read, [(filename, error)] for the others)
+        """
+        opened = []
+        failed = []
+        for filename in filenames:
+            try:
+                opened.append((filename, self.add_file(filename)))
+            except (OSError, UnicodeDecodeError) as e:
+                failed.append((filename, e))
+        return StoreCorpus(self._db, opened), failed
+
+    def add_file(self, filename):
+        """ Reads a file into the database unless it is there and unchanged. Returns its id """
+        name = os.path.abspath(filename)
+        st = os.stat(filename)
+        row = self._db.execute("SELECT id, size, mtime_ns FROM files WHERE name = ?", (name,)).fetchone()
+        if row is not None and row[1:] == (st.st_size, st.st_mtime_ns):
+            return row[0]
+        try:
+            with self._db: # One transaction, so a file that can't be read leaves nothing behind
+                if row is not None:
+                    self._delete_file(row[0])
+                file_id = self._db.execute(
+                    "INSERT INTO files (name, size, mtime_ns, total_words, distinct_words) VALUES (?, ?, ?, 0, 0)",
+                    (name, st.st_size, st.st_mtime_ns)).lastrowid
+                self._insert_words(file_id, filename, st.st_size)
+        except BaseException:
+            self._word_ids.clear() # Words added by the file are gone with its transaction
+            raise
+        return file_id
+
+    def _delete_file(self, file_id):
+        self._db.execute("DELETE FROM positions WHERE word_id IN (SELECT word_id FROM counts WHERE file_id = ?) "
+                         "AND file_id = ?", (file_id, file_id))
+        self._db.execute("DELETE FROM counts WHERE file_id = ?", (file_id,))
+        self._db.execute("DELETE FROM spellings WHERE file_id = ?", (file_id,))
+        self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    # Streams the words of a file into the positions table and records its counts
+    def _insert_words(self, file_id, filename, size):
+        started = STATS.start()
+        counts = Counter()
+        spellings = set()
+        word_ids = self._word_ids
+        rows = []
+        position = 0
+        prev_line = 0
+        word_num = 0
+        insert = "INSERT INTO positions (word_id, file_id, position, line, word_num) VALUES (?, ?, ?, ?, ?)"
+        with open(filename, "rb") as f:
+            for words, lines in iter_word_chunks(f, READ_CHUNK_SIZE):
+                spellings.update(words)
+                for word, line_num in zip(words, lines):
+                    # Word numbers restart on every line, like the concordance's
+                    if line_num != prev_line:
+                        prev_line = line_num
+                        word_num = 0
+                    word_num += 1
+                    word = word.lower()
+                    word_id = word_ids.get(word) or self._word_id(word) # Ids start at 1
+                    counts[word_id] += 1
+                    rows.append((word_id, file_id, position, line_num, word_num))
+                    position += 1
+                if len(rows) >= STORE_BATCH_SIZE:
+                    self._db.executemany(insert, rows)
+                    rows = []
+        self._db.executemany(insert, rows)
+        self._db.executemany("INSERT INTO counts (word_id, file_id, count) VALUES (?, ?, ?)",
+                             ((word_id, file_id, count) for word_id, count in counts.items()))
+        self._db.executemany("INSERT INTO spellings (file_id, spelling) VALUES (?, ?)",
+                             ((file_id, spelling) for spelling in spellings))
+        self._db.execute("UPDATE files SET total_words = ?, distinct_words = ? WHERE id = ?",
+                         (position, len(spellings), file_id))
+        STATS.stop(started, "store file", position, size)
+
+    def _word_id(self, word):
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            row = self._db.execute("SELECT id FROM words WHERE word = ?", (word,)).fetchone()
+            if row is not None:
+                word_id = row[0]
+            else:
+                word_id = self._db.execute("INSERT INTO words (word, sort_key) VALUES (?, ?)",
+                                           (word, collation_key(word))).lastrowid
+            self._word_ids[word] = word_id
+        return word_id
+
+class StoreFile:
+    """ The counts of one file of a StoreCorpus, like a CorpusFile's """
+    def __init__(self, name, total_words, distinct_words):
+        self.name = name
+        self.total_words = total_words
+        self.distinct_words = distinct_words
+
+class StoreCorpus:
+    """
+    Files of an SqliteStore, numbered 1, 2, ... in the order they were given.
+    Has the methods of Corpus that batch mode uses, answered with SQL queries,
+    and writes the concordance and extra lists straight from the database.
+    """
+    def __init__(self, db, opened):
+        self._db = db
+        self.filenames = [filename for filename, _ in opened]
+        self._file_ids = [file_id for _, file_id in opened]
+        # The files of this corpus, in a temporary table the queries join with
+        db.execute("CREATE TEMP TABLE IF NOT EXISTS selected (file_num INTEGER PRIMARY KEY, file_id INTEGER NOT NULL UNIQUE)")
+        with db:
+            db.execute("DELETE FROM selected")
+            db.executemany("INSERT INTO selected (file_num, file_id) VALUES (?, ?)",
+                           enumerate(self._file_ids, start=1))
+        self.stats = StoreStats(db)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __iter__(self):
+        rows = dict((row[0], row[1:]) for row in self._db.execute(
+            "SELECT f.id, f.total_words, f.distinct_words FROM selected s JOIN files f ON f.id = s.file_id"))
+        for filename, file_id in zip(self.filenames, self._file_ids):
+            yield StoreFile(filename, *rows[file_id])
+
+    def print_file_table(self):
+        """ print_file_table for the files, from the counts in the database """
+        started = STATS.start()
+        rows = [[f.name, f.total_words, f.distinct_words] for f in self]
+        totals = (self.stats.total_words, self.stats.distinct_spellings) if len(rows) > 1 else None
+        for line in file_table_lines(rows, totals):
+            print(line)
+        STATS.stop(started, "print_file_table", sum(row[1] for row in rows))
+
+    def count_words(self, words):
+        """ Like Corpus.count_words: {lowercased word: [filename, count] pairs}, in order """
+        started = STATS.start()
+        words = list(dict.fromkeys(word.lower() for word in words))
+        results = {}
+        for word in words:
+            counts = dict(self._db.execute(
+                "SELECT c.file_id, c.count FROM words w JOIN counts c ON c.word_id = w.id WHERE w.word = ?",
+                (word,)))
+            results[word] = [[filename, counts.get(file_id, 0)]
+                             for filename, file_id in zip(self.filenames, self._file_ids)]
+        STATS.stop(started, "count_word", len(words))
+        return results
+
+    def expand_search(self, words):
+        """ Like Corpus.expand_search, with SQLite's GLOB (which has the same * and ?) """
+        expanded = []
+        matches = {}
+        for word in words:
+            if is_pattern(word):
+                matches[word] = [row[0] for row in self._db.execute(
+                    "SELECT w.word FROM words w WHERE w.word GLOB ? AND EXISTS "
+                    "(SELECT 1 FROM selected s JOIN counts c ON c.file_id = s.file_id AND c.word_id = w.id) "
+                    "ORDER BY w.word", (word.lower(),))]
+                expanded += matches[word]
+            else:
+                expanded.append(word)
+        return expanded, matches
+
+    def positional_search(self, words, distance=None, max_locations=10):
+        """ Like Corpus.positional_search, with joins of the positions table """
+        started = STATS.start()
+        word_ids = []
+        totals = []
+        for word in words:
+            row = self._db.execute(
+                "SELECT w.id, SUM(c.count) FROM words w JOIN selected s JOIN counts c "
+                "ON c.word_id = w.id AND c.file_id = s.file_id WHERE w.word = ?", (word.lower(),)).fetchone()
+            word_ids.append(row[0])
+            totals.append(row[1] or 0)
+        found = {}
+        if 0 not in totals:
+            if distance is None:
+                query, params = self._phrase_query(word_ids, totals)
+            else:
+                query = ("SELECT s.file_num, a.line, a.word_num FROM selected s CROSS JOIN positions a "
+                         "ON a.word_id = ? AND a.file_id = s.file_id WHERE EXISTS (SELECT 1 FROM positions b "
+                         "WHERE b.word_id = ? AND b.file_id = a.file_id "
+                         "AND b.position BETWEEN a.position - ? AND a.position + ? AND b.position != a.position) "
+                         "ORDER BY s.file_num, a.position")
+                params = (word_ids[0], word_ids[1], distance, distance)
+            for file_num, line_num, word_num in self._db.execute(query, params):
+                result = found.setdefault(file_num, [0, array('I')])
+                if result[0] < max_locations:
+                    result[1].extend((file_num, line_num, word_num))
+                result[0] += 1
+        results = []
+        for file_num, filename in enumerate(self.filenames, start=1):
+            count, locations = found.get(file_num, (0, array('I')))
+            results.append([filename, count, locations])
+        STATS.stop(started, "positional_search")
+        return results
+
+    # Query for a phrase, that starts from the positions of its rarest word
+    @staticmethod
+    def _phrase_query(word_ids, totals):
+        rarest = totals.index(min(totals))
+        joins = []
+        params = [word_ids[rarest]]
+        for offset, word_id in enumerate(word_ids):
+            if offset != rarest:
+                joins.append(f"CROSS JOIN positions p{offset} ON p{offset}.word_id = ? "
+                             f"AND p{offset}.file_id = r.file_id AND p{offset}.position = r.position + ?")
+                params += [word_id, offset - rarest]
+        first = "r" if rarest == 0 else "p0" # Locations are the first word's
+        query = (f"SELECT s.file_num, {first}.line, {first}.word_num FROM selected s CROSS JOIN positions r "
+                 f"ON r.word_id = ? AND r.file_id = s.file_id " + " ".join(joins) +
+                 " ORDER BY s.file_num, r.position")
+        return query, params
+
+    def concordance(self):
+        """
+        Yields (word, packed locations) for every word of the files, in concordance order
+        (see write_concordance). Only one word's locations are in memory at a time.
+        """
+        rows = self._db.execute(
+            "SELECT w.word, s.file_num, p.line, p.word_num FROM words w CROSS JOIN selected s "
+            "CROSS JOIN positions p ON p.word_id = w.id AND p.file_id = s.file_id "
+            "ORDER BY w.sort_key, s.file_num, p.position")
+        word = None
+        locations = array('I')
+        for row_word, file_num, line_num, word_num in rows:
+            if row_word != word:
+                if word is not None:
+                    yield word, locations
+                word = row_word
+                locations = array('I')
+            locations.extend((file_num, line_num, word_num))
+        if word is not None:
+            yield word, locations
+
+    def write_concordance(self, dest="CONCORDANCE.TXT", echo="all", buffer_size=OUTPUT_BUFFER_SIZE):
+        return write_concordance(self.concordance(), dest, echo, buffer_size)
+
+    def extra_lists_lines(self):
+        """ Lines of ExtraLists.txt for the files, like extra_lists_lines """
+        per_word = ("SELECT w.word, SUM(c.count) AS total, COUNT(*) AS files, MIN(s.file_num) "
+                    "FROM selected s CROSS JOIN counts c ON c.file_id = s.file_id JOIN words w ON w.id = c.word_id "
+                    "GROUP BY c.word_id {} ORDER BY {}")
+        top_ten = [row[:3] for row in self._db.execute(per_word.format("", "total DESC, w.sort_key LIMIT 10"))]
+        in_all_files = (row[0] for row in self._db.execute(
+            per_word.format("HAVING files = ?", "w.sort_key"), (len(self),)))
+        in_one_file = ((row[0], row[3]) for row in self._db.execute(
+            per_word.format("HAVING files = 1", "w.sort_key")))
+        return extra_lists_report_lines(top_ten, in_all_files, in_one_file)
+
+    def write_extra_lists(self, dest="ExtraLists.txt", echo="all", buffer_size=OUTPUT_BUFFER_SIZE):
+        started = STATS.start()
+        count = write_lines(self.extra_lists_lines(), dest, echo, buffer_size)
+        STATS.stop(started, "write_extra_lists", count)
+        return count
+
+class StoreStats:
+    """ The CorpusStats figures batch mode reports, for the files of a StoreCorpus """
+    def __init__(self, db):
+        self._db = db
+
+    def _value(self, query):
+        return self._db.execute(query).fetchone()[0] or 0
+
+    @property
+    def total_words(self):
+        return self._value("SELECT SUM(f.total_words) FROM selected s JOIN files f ON f.id = s.file_id")
+
+    @property
+    def distinct_words(self):
+        return self._value("SELECT COUNT(DISTINCT c.word_id) FROM selected s CROSS JOIN counts c ON c.file_id = s.file_id")
+
+    @property
+    def distinct_spellings(self):
+        return self._value("SELECT COUNT(DISTINCT p.spelling) FROM selected s JOIN spellings p ON p.file_id = s.file_id")
+
+    def top(self, k=10):
+        """ Returns the k most frequent words as (word, count, number of files) tuples """
+        return [tuple(row) for row in self._db.execute(
+            "SELECT w.word, SUM(c.count) AS total, COUNT(*) FROM selected s CROSS JOIN counts c ON c.file_id = s.file_id "
+            "JOIN words w ON w.id = c.word_id GROUP BY c.word_id ORDER BY total DESC, w.word LIMIT ?", (k,))]